@@ -0,0 +1,291 @@
+import random, heapq, argparse, time
+from array import array
+from collections import deque
+from snakeCore import FreeCells, FixedTimestep, TICK_RATE, MOVE_DELAY, MIN_MOVE_DELAY, SPEED_EFFECT_TICKS
+
+# Арена: много змеек и предметов на большом поле по правилам snakeCore.
+# Состояние змеек — параллельные массивы, тела — деки номеров клеток (y*grid_size + x).
+# Общая сетка grid знает, что лежит в каждой клетке, поэтому столкновение или подбор предмета —
+# одно чтение из неё на каждую голову, которая ходит в этом тике, сколько бы ни было змеек и тел
+UP, DOWN, LEFT, RIGHT = range(4)  # как в snakeBatch и записях snakeReplay
+DX, DY = (0, 0, -1, 1), (-1, 1, 0, 0)
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+FOOD, POISON, POTION = -1, -2, -3  # в grid: 0 — пусто, >0 — тело змейки номер value-1, <0 — предмет
+MOVE, TAIL, SPAWN, CLEAR, DIED, BORN = range(6)  # события арены: из них сеть собирает дельты (snakeServer)
+START_LENGTH = 3
+
+class Arena:
+    def __init__(self, grid_size=512, snakes=100, food=400, poison=100, potions=100, seed=None):
+        self.grid_size, self.cells = grid_size, grid_size * grid_size
+        self.rng, self.tick = random.Random(seed), 0
+        self.grid = array('i', bytes(4 * self.cells))
+        self.free_cells = FreeCells(grid_size)
+        self.count = snakes
+        self.bodies = [deque() for _ in range(snakes)]  # голова — bodies[i][0]
+        self.direction, self.next_direction = array('b', bytes(snakes)), array('b', bytes(snakes))
+        self.alive = bytearray(snakes)
+        self.grow_to, self.score = array('l', bytes(8 * snakes)), array('l', bytes(8 * snakes))
+        self.move_delay, self.speed_end = array('l', [MOVE_DELAY]) * snakes, array('l', bytes(8 * snakes))
+        self.death = [None] * snakes  # "wall", "self", "body" (чужое тело) или "head" (лоб в лоб)
+        # Ходы по тикам: tick -> номера змеек, которые ходят в этом тике. Тик без ходов ничего не стоит.
+        # next_move отсекает устаревшие записи, если змейку убили или возродили снаружи update
+        self.moves, self.next_move = {}, array('l', bytes(8 * snakes))
+        self.events = None  # список, куда складываются события (MOVE, номер, клетка) и т. п.; None — не нужны
+        # Отложенные появления яда и зелья — куча (тик, вид); зелья живут до срока из self.potions
+        self.spawns, self.expiry, self.potions = [], [], {}
+        for i in range(snakes):
+            self.spawn_snake(i)
+        for kind, amount in ((FOOD, food), (POISON, poison), (POTION, potions)):
+            for _ in range(amount):
+                self.spawn_item(kind)
+
+    def spawn_snake(self, i):
+        cell = self.free_cells.pick_cell(self.rng)
+        if cell is None:
+            return False
+        self.free_cells.remove_cell(cell)
+        self.grid[cell] = i + 1
+        self.bodies[i] = deque([cell])
+        self.direction[i] = self.next_direction[i] = self.rng.randrange(4)
+        self.alive[i], self.death[i] = 1, None
+        self.grow_to[i], self.score[i] = START_LENGTH, 0
+        self.move_delay[i], self.speed_end[i] = MOVE_DELAY, 0
+        self.schedule(i, self.tick + MOVE_DELAY)
+        if self.events is not None:
+            self.events.append((BORN, i, cell))
+        return True
+
+    def schedule(self, i, tick):
+        self.next_move[i] = tick
+        self.moves.setdefault(tick, []).append(i)
+
+    def spawn_item(self, kind):
+        cell = self.free_cells.pick_cell(self.rng)
+        if cell is None:
+            heapq.heappush(self.spawns, (self.tick + TICK_RATE, kind))  # места нет — попробуем позже
+            return
+        self.free_cells.remove_cell(cell)
+        self.grid[cell] = kind
+        if self.events is not None:
+            self.events.append((SPAWN, cell, kind))
+        if kind == POTION:
+            expire = self.potions[cell] = self.tick + self.rng.randint(5 * TICK_RATE, 8 * TICK_RATE)
+            heapq.heappush(self.expiry, (expire, cell))
+
+    def respawn_later(self, kind):
+        delay = self.rng.randint(15, 25) if kind == POISON else self.rng.randint(10, 20)
+        heapq.heappush(self.spawns, (self.tick + delay * TICK_RATE, kind))
+
+    def turn(self, i, direction):
+        # Те же правила, что у Snake.turn: разворот назад запрещён
+        if direction == OPPOSITE[self.direction[i]] or direction == self.next_direction[i]:
+            return False
+        self.next_direction[i] = direction
+        return True
+
+    def due(self, tick=None):
+        # Змейки, которые ходят в указанном (по умолчанию — следующем) тике
+        tick = self.tick + 1 if tick is None else tick
+        return [i for i in self.moves.get(tick, ()) if self.alive[i] and self.next_move[i] == tick]
+
+    def update(self):
+        self.tick += 1
+        tick, grid, n = self.tick, self.grid, self.grid_size
+        while self.spawns and self.spawns[0][0] <= tick:
+            self.spawn_item(heapq.heappop(self.spawns)[1])
+        while self.expiry and self.expiry[0][0] <= tick:
+            expire, cell = heapq.heappop(self.expiry)
+            if self.potions.get(cell) == expire:
+                # Зелье исчезло само; устаревшие записи кучи (зелье уже съели) просто пропускаются
+                del self.potions[cell]
+                grid[cell] = 0
+                self.free_cells.add_cell(cell)
+                self.respawn_later(POTION)
+                if self.events is not None:
+                    self.events.append((CLEAR, cell))
+
+        # Сначала все головы смотрят в сетку, пока тела ещё на месте: исход не зависит от порядка змеек
+        dead, targets, events = [], {}, self.events
+        for i in self.moves.pop(tick, ()):
+            if not self.alive[i] or self.next_move[i] != tick:
+                continue
+            direction = self.direction[i] = self.next_direction[i]
+            head = self.bodies[i][0]
+            x, y = head % n + DX[direction], head // n + DY[direction]
+            if not (0 <= x < n and 0 <= y < n):
+                dead.append((i, "wall"))
+                continue
+            cell = y*n + x
+            if grid[cell] > 0:
+                dead.append((i, "self" if grid[cell] == i + 1 else "body"))
+            elif cell in targets:
+                targets[cell].append(i)
+            else:
+                targets[cell] = [i]
+
+        for cell, movers in targets.items():
+            if len(movers) > 1:
+                dead += [(i, "head") for i in movers]
+                continue
+            i = movers[0]
+            item, grid[cell] = grid[cell], i + 1
+            body = self.bodies[i]
+            body.appendleft(cell)
+            if events is not None:
+                events.append((MOVE, i, cell))
+            if item == 0:
+                self.free_cells.remove_cell(cell)
+            if len(body) > self.grow_to[i]:
+                self.pop_tail(i)
+            if self.speed_end[i] and tick > self.speed_end[i]:
+                self.speed_end[i], self.move_delay[i] = 0, MOVE_DELAY
+            if item:
+                self.consume(i, cell, item)
+            self.schedule(i, tick + self.move_delay[i])
+
+        for i, cause in dead:
+            self.kill(i, cause)
+        return dead
+
+    def pop_tail(self, i):
+        tail = self.bodies[i].pop()
+        self.grid[tail] = 0
+        self.free_cells.add_cell(tail)
+        if self.events is not None:
+            self.events.append((TAIL, i))
+        return tail
+
+    def consume(self, i, cell, item):
+        if item == FOOD:
+            self.grow_to[i] += 1
+            self.score[i] += 10
+            self.spawn_item(FOOD)
+        elif item == POISON:
+            if self.grow_to[i] > 1:
+                self.grow_to[i] -= 1
+                self.score[i] = max(0, self.score[i] - 5)
+                if len(self.bodies[i]) > self.grow_to[i]:
+                    self.pop_tail(i)
+            self.respawn_later(POISON)
+        else:
+            del self.potions[cell]
+            self.speed_end[i] = self.tick + SPEED_EFFECT_TICKS
+            self.move_delay[i] = max(MIN_MOVE_DELAY, self.move_delay[i] // 2)
+            self.respawn_later(POTION)
+
+    def kill(self, i, cause):
+        # Единственное место, где обходится всё тело: клетки погибшей змейки освобождаются
+        self.alive[i], self.death[i] = 0, cause
+        for cell in self.bodies[i]:
+            self.grid[cell] = 0
+            self.free_cells.add_cell(cell)
+        self.bodies[i].clear()
+        if self.events is not None:
+            self.events.append((DIED, i))
+
+    def steer(self, i):
+        # Простой бот: не врезаться в то, что прямо впереди, иногда сворачивать, яд обходить
+        n, head, current = self.grid_size, self.bodies[i][0], self.direction[i]
+        options = [current, *self.rng.sample((UP, DOWN, LEFT, RIGHT), 4)] if self.rng.random() > 0.05 \
+            else self.rng.sample((UP, DOWN, LEFT, RIGHT), 4)
+        fallback = None
+        for direction in options:
+            if direction == OPPOSITE[current]:
+                continue
+            x, y = head % n + DX[direction], head // n + DY[direction]
+            if 0 <= x < n and 0 <= y < n and self.grid[y*n + x] <= 0:
+                if self.grid[y*n + x] != POISON:
+                    self.turn(i, direction)
+                    return
+                fallback = direction
+        if fallback is not None:
+            self.turn(i, fallback)
+
+SNAKE_COLORS = [(40, 180, 40), (200, 200, 90), (230, 160, 40), (200, 70, 200), (60, 200, 200), (230, 90, 90)]
+ITEM_COLORS = {FOOD: (220, 50, 50), POISON: (150, 0, 200), POTION: (50, 150, 255)}
+
+class ArenaView:
+    # Рисует только клетки, попавшие в окно: работа зависит от размера экрана, а не поля или числа змеек
+    def __init__(self, cell_size=8):
+        import pygame
+        self.pygame, self.cell_size = pygame, cell_size
+
+    def draw(self, surface, arena, center):
+        cs, n, grid = self.cell_size, arena.grid_size, arena.grid
+        width, height = surface.get_size()
+        cols, rows = min(n, width // cs + 1), min(n, height // cs + 1)
+        x0 = max(0, min(n - cols, center % n - cols // 2))
+        y0 = max(0, min(n - rows, center // n - rows // 2))
+        surface.fill((15, 30, 15))
+        fill = surface.fill
+        for y in range(y0, y0 + rows):
+            row, py = grid[y*n + x0 : y*n + x0 + cols], (y - y0) * cs
+            for x, value in enumerate(row):
+                if value:
+                    color = SNAKE_COLORS[(value - 1) % len(SNAKE_COLORS)] if value > 0 else ITEM_COLORS[value]
+                    fill(color, (x * cs, py, cs - 1, cs - 1))
+        # Головы светлее тел; их столько же, сколько змеек, а не клеток тел
+        for body in arena.bodies:
+            if body:
+                x, y = body[0] % n - x0, body[0] // n - y0
+                if 0 <= x < cols and 0 <= y < rows:
+                    fill((240, 250, 240), (x * cs + 1, y * cs + 1, cs - 3, cs - 3))
+        return x0, y0
+
+def bench(arena, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for i in arena.due():
+            arena.steer(i)
+        for i, cause in arena.update():
+            arena.spawn_snake(i)
+    return ticks / (time.perf_counter() - start)
+
+def play(arena, cell_size):
+    import pygame
+    pygame.display.init()
+    screen = pygame.display.set_mode((1024, 768))
+    pygame.display.set_caption("Змейка: арена")
+    view, clock, timestep = ArenaView(cell_size), pygame.time.Clock(), FixedTimestep()
+    keys = {pygame.K_w: UP, pygame.K_UP: UP, pygame.K_s: DOWN, pygame.K_DOWN: DOWN,
+            pygame.K_a: LEFT, pygame.K_LEFT: LEFT, pygame.K_d: RIGHT, pygame.K_RIGHT: RIGHT}
+    camera = arena.bodies[0][0]
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN and event.key in keys:
+                if arena.alive[0]:
+                    arena.turn(0, keys[event.key])
+                else:
+                    arena.spawn_snake(0)
+        for _ in range(timestep.advance(time.perf_counter())):
+            # Змейка 0 — игрок, остальные — боты, которые возрождаются сразу
+            for i in arena.due():
+                if i:
+                    arena.steer(i)
+            for i, cause in arena.update():
+                if i:
+                    arena.spawn_snake(i)
+        if arena.alive[0]:
+            camera = arena.bodies[0][0]
+        view.draw(screen, arena, camera)
+        pygame.display.flip()
+        clock.tick(60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Арена: много змеек и предметов на большом поле")
+    parser.add_argument("--grid", type=int, default=512)
+    parser.add_argument("--snakes", type=int, default=100)
+    parser.add_argument("--food", type=int, default=400)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--cell", type=int, default=8, help="размер клетки на экране")
+    parser.add_argument("--bench", type=int, metavar="TICKS", help="без окна: прогнать тики и напечатать тиков/с")
+    args = parser.parse_args()
+
+    arena = Arena(args.grid, args.snakes, args.food, args.food // 4, args.food // 4, args.seed)
+    if args.bench:
+        print(f"{bench(arena, args.bench):.0f} тиков/с ({args.snakes} змеек, поле {args.grid}×{args.grid})")
+    else:
+        play(arena, args.cell)
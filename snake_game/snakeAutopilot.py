@@ -0,0 +1,209 @@
+import time
+from array import array
+from collections import deque
+from snakeCore import UP, DOWN, LEFT, RIGHT
+
+# Автопилот: идёт по гамильтонову циклу и срезает путь к еде, пока это не ломает порядок тела вдоль цикла,
+# поэтому доживает до заполнения поля. Путь к цели выбирается по полю расстояний BFS от цели, которое
+# растёт по кусочкам в пределах бюджета времени на тик и переиспользуется, пока цель и яд не сдвинулись.
+# Вся остальная работа за тик тоже либо O(1), либо укладывается в тот же бюджет
+POTION_WEIGHT = 0.5  # зелье берём, если до него меньше половины пути до еды
+FULL_CHECK = 512  # тело не длиннее этого проверяется на порядок по циклу сразу, длиннее — по ходу игры
+
+def hamiltonian_cycle(n):
+    # Гамильтонов цикл по полю n×n (n чётное): вниз по столбцу 0, дальше змейкой по строкам в столбцах 1..n-1
+    path = [(0, y) for y in range(n)]
+    for y in range(n-1, -1, -1):
+        xs = range(1, n) if (n-1-y) % 2 == 0 else range(n-1, 0, -1)
+        path += [(x, y) for x in xs]
+    return path
+
+class Autopilot:
+    def __init__(self, grid_size, budget=0.0005):
+        self.grid_size, self.cells, self.budget = grid_size, grid_size * grid_size, budget
+        self.order = None
+        if grid_size % 2 == 0:
+            self.order = array('l', bytes(8 * self.cells))
+            for i, (x, y) in enumerate(hamiltonian_cycle(grid_size)):
+                self.order[y*grid_size + x] = i
+        self.field_key, self.field, self.planner, self.previous = None, None, None, None
+        self.body, self.total, self.known, self.on_cycle = None, 0, False, False
+
+    def cell(self, pos):
+        return pos[1]*self.grid_size + pos[0]
+
+    def ahead(self, a, b):
+        # Сколько шагов по циклу от клетки a до клетки b
+        return (self.order[b] - self.order[a]) % self.cells
+
+    def follow(self, snake):
+        # Тело идёт от хвоста к голове строго по порядку цикла — тогда срезы безопасны. Сумма шагов по циклу
+        # между соседними звеньями ведётся по ходу игры: новая голова прибавляет шаг, ушедший хвост вычитает.
+        # Чужое длинное тело целиком не обходим: пока голова не прошла всю его длину, порядок неизвестен (None)
+        body = snake.positions
+        if self.body is None or not self.sync(body):
+            if len(body) <= FULL_CHECK:
+                cells = [self.cell(pos) for pos in body]
+                self.body, self.known = deque(body), True
+                self.total = sum(self.ahead(behind, front) for front, behind in zip(cells, cells[1:]))
+            else:
+                self.body, self.total, self.known = deque([body[0]]), 0, False
+        if not self.known:
+            return None
+        return self.total < self.cells
+
+    def sync(self, body):
+        # Догоняем копию тела: клетки, которые голова прошла с прошлого хода, и клетки, ушедшие с хвоста
+        mirror, fresh = self.body, []
+        for pos in body:
+            if pos == mirror[0]:
+                break
+            fresh.append(pos)
+            if len(fresh) > 64:
+                return False
+        else:
+            return False
+        for pos in reversed(fresh):
+            self.total += self.ahead(self.cell(mirror[0]), self.cell(pos))
+            mirror.appendleft(pos)
+        if len(mirror) < len(body):
+            return not self.known
+        while len(mirror) > len(body):
+            tail = mirror.pop()
+            self.total -= self.ahead(self.cell(tail), self.cell(mirror[-1]))
+        self.known = mirror[-1] == body[-1]
+        return self.known
+
+    def bfs(self, field, target, blocked):
+        # Заполняет поле расстояний до цели с обходом яда; отдаёт управление каждые 128 клеток
+        n = self.grid_size
+        field[target], queue, done = 0, deque([target]), 0
+        while queue:
+            cell = queue.popleft()
+            x, y = cell % n, cell // n
+            for nx, ny in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+                if 0 <= nx < n and 0 <= ny < n:
+                    other = ny*n + nx
+                    if field[other] < 0 and other != blocked:
+                        field[other] = field[cell] + 1
+                        queue.append(other)
+            done += 1
+            if done % 128 == 0:
+                yield
+
+    def plan(self, key, wanted, deadline):
+        # BFS идёт слоями от цели, поэтому первая размеченная клетка вокруг головы уже ближайшая к цели —
+        # дальше поле не считаем. Голова движется к цели, и на следующих ходах её соседи уже размечены.
+        # Пока новое поле не дотянулось до головы, а цель та же (сдвинулся только яд), ходим по старому
+        if key != self.field_key:
+            self.previous = self.field if self.field_key is not None and key[0] == self.field_key[0] else None
+            self.field_key, self.field = key, array('l', [-1]) * self.cells
+            self.planner = self.bfs(self.field, *key)
+        field = self.field
+        while self.planner is not None and not any(field[cell] >= 0 for cell in wanted):
+            if time.perf_counter() >= deadline:
+                return self.previous
+            if next(self.planner, True):
+                self.planner = None
+        self.previous = None
+        return field
+
+    def target(self, sim, head):
+        food = self.cell(sim.food.position) if sim.food.position is not None else None
+        potion = sim.speed_potion
+        if potion.active and self.order is not None:
+            potion_cell = self.cell(potion.position)
+            if food is None or self.ahead(head, potion_cell) < self.ahead(head, food) * POTION_WEIGHT:
+                return potion_cell
+        return food
+
+    def decide(self, sim):
+        # Направление на ближайший ход змейки (или None, если ходить некуда)
+        deadline = time.perf_counter() + self.budget
+        snake = sim.snake
+        head = self.cell(snake.get_head_position())
+        n, x, y = self.grid_size, head % self.grid_size, head // self.grid_size
+        options = []
+        for direction in (UP, DOWN, LEFT, RIGHT):
+            nx, ny = x + direction[0], y + direction[1]
+            if 0 <= nx < n and 0 <= ny < n and not snake.occupied[ny*n + nx] \
+               and direction != (-snake.direction[0], -snake.direction[1]):
+                options.append((direction, ny*n + nx))
+        if not options:
+            return None
+
+        if self.order is not None:
+            self.on_cycle = self.follow(snake)
+        poison = self.cell(sim.poison.position) if sim.poison.active else None
+        target = self.target(sim, head)
+        field = self.plan((target, poison), [c for _, c in options], deadline) if target is not None else None
+        return self.choose(snake, head, options, target, poison, field, deadline)
+
+    def choose(self, snake, head, options, target, poison, field, deadline):
+        n = self.grid_size
+        if self.on_cycle:
+            tail = self.cell(snake.positions[-1])
+            free_ahead = self.ahead(head, tail) if len(snake.positions) > 1 else self.cells
+            # Срез оставляет позади пустые клетки, которые освободятся, только когда их пройдёт хвост.
+            # Пока этого не случилось, впереди должно хватать места на всё тело и на рост
+            margin = len(snake.positions) + 3 + max(0, snake.grow_to - len(snake.positions))
+            limit = self.ahead(head, target) if target is not None else 1
+            safe = [(d, c) for d, c in options
+                    if self.ahead(head, c) == 1 or 0 < self.ahead(head, c) < free_ahead - margin]
+            # Перелетать цель нельзя; если до неё не дотянуться (например, следующая клетка цикла
+            # позади короткой змейки), берём ближайшую по циклу безопасную клетку
+            reachable = [(d, c) for d, c in safe if self.ahead(head, c) <= limit]
+            if safe and not reachable:
+                reachable = [min(safe, key=lambda option: self.ahead(head, option[1]))]
+            safe = reachable
+            if safe:
+                clean = [(d, c) for d, c in safe if c != poison] or safe
+                if field is None or all(field[c] < 0 for _, c in clean):
+                    # BFS ещё не дошёл до головы — просто следующая клетка цикла (или ближайшая по нему)
+                    return min(clean, key=lambda option: self.ahead(head, option[1]))[0]
+                return min(clean, key=lambda option: (field[option[1]] if field[option[1]] >= 0 else self.cells,
+                                                      -self.ahead(head, option[1])))[0]
+
+        # Вне цикла (нечётное поле или автопилот включили посреди партии) — жадно к цели по BFS,
+        # но не в тупик, где телу не хватит места. Соседние клетки часто лежат в одной области, и одна
+        # заливка отвечает за обе; если бюджет кончился, берём проверенные клетки, а без них — все
+        clean = [(d, c) for d, c in options if c != poison] or options
+        areas, roomy = [], []
+        for option in clean:
+            fits = next((fits for area, fits in areas if option[1] in area), None)
+            if fits is None:
+                fits, area = self.room(snake, option[1], len(snake.positions), deadline)
+                if fits is None:
+                    break
+                areas.append((area, fits))
+            if fits:
+                roomy.append(option)
+        roomy = roomy or clean
+        if self.on_cycle is None:
+            # Порядок тела ещё неизвестен — идём по циклу, чтобы со временем на него встать
+            ahead = [option for option in roomy if self.ahead(head, option[1]) == 1]
+            if ahead:
+                return ahead[0][0]
+        if field is not None and any(field[c] >= 0 for _, c in roomy):
+            return min(roomy, key=lambda option: field[option[1]] if field[option[1]] >= 0 else self.cells)[0]
+        if target is not None:
+            tx, ty = target % n, target // n
+            return min(roomy, key=lambda option: abs(option[1] % n - tx) + abs(option[1] // n - ty))[0]
+        return roomy[0][0]
+
+    def room(self, snake, start, need, deadline):
+        # Есть ли от клетки start хотя бы need свободных клеток; заливка останавливается, как только набрала.
+        # None — бюджет кончился раньше, чем стало ясно
+        n, seen, queue, done = self.grid_size, {start}, deque([start]), 0
+        while queue and len(seen) < need:
+            if done % 64 == 0 and time.perf_counter() >= deadline:
+                return None, seen
+            done += 1
+            cell = queue.popleft()
+            x, y = cell % n, cell // n
+            for nx, ny in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+                other = ny*n + nx
+                if 0 <= nx < n and 0 <= ny < n and other not in seen and not snake.occupied[other]:
+                    seen.add(other)
+                    queue.append(other)
+        return len(seen) >= need, seen
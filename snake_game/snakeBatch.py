@@ -0,0 +1,143 @@
+import numpy as np
+from snakeCore import GRID_SIZE, TICK_RATE, MOVE_DELAY, MIN_MOVE_DELAY, SPEED_EFFECT_TICKS
+
+# Пакетная среда: N независимых полей в массивах NumPy, один векторный шаг — один ход змейки на каждом поле.
+# Правила те же, что в snakeCore; таймеры считаются в тиках, за ход проходит move_delay тиков
+UP, DOWN, LEFT, RIGHT = range(4)  # действия, в том же порядке, что и в записях snakeReplay
+DX, DY = np.array([0, 0, -1, 1]), np.array([-1, 1, 0, 0])
+OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT])
+EMPTY, BODY, HEAD, FOOD, POISON, POTION = range(6)  # значения клеток в наблюдении
+
+class BatchSnakeEnv:
+    def __init__(self, n, grid_size=GRID_SIZE, seed=None, auto_reset=True):
+        self.n, self.grid_size, self.cells = n, grid_size, grid_size * grid_size
+        self.rng, self.auto_reset = np.random.default_rng(seed), auto_reset
+        self.rows = np.arange(n)
+        # Тело — кольцевой буфер номеров клеток, голова в body[b, head_index[b]]
+        self.body = np.zeros((n, self.cells), np.int32)
+        self.occupied = np.zeros((n, self.cells), bool)
+        self.head_index, self.length = np.zeros(n, np.int64), np.zeros(n, np.int64)
+        self.direction = np.zeros(n, np.int64)
+        self.grow_to, self.score = np.zeros(n, np.int64), np.zeros(n, np.int64)
+        self.alive, self.board_full = np.zeros(n, bool), np.zeros(n, bool)
+        self.tick, self.move_delay, self.speed_end = (np.zeros(n, np.int64) for _ in range(3))
+        # Предметы: клетка (-1 — нет), флаг активности и таймеры в тиках
+        self.food, self.poison, self.potion = (np.full(n, -1, np.int64) for _ in range(3))
+        self.poison_spawn, self.potion_spawn, self.potion_expire = (np.zeros(n, np.int64) for _ in range(3))
+        self.reset()
+
+    def reset(self, mask=None):
+        boards = self.rows if mask is None else self.rows[mask]
+        if len(boards) == 0:
+            return
+        self.occupied[boards] = False
+        center = (self.grid_size//2) * self.grid_size + self.grid_size//2
+        self.body[boards, 0], self.occupied[boards, center] = center, True
+        self.head_index[boards], self.length[boards] = 0, 1
+        self.direction[boards] = RIGHT
+        self.grow_to[boards] = self.score[boards] = 0
+        self.alive[boards], self.board_full[boards] = True, False
+        self.tick[boards], self.move_delay[boards], self.speed_end[boards] = 0, MOVE_DELAY, 0
+        self.poison[boards] = self.potion[boards] = -1
+        self.food[boards] = -1
+        self.food[boards] = self.random_free(boards)
+        self.poison_spawn[boards] = self.rng.integers(15, 26, len(boards)) * TICK_RATE
+        self.potion_spawn[boards] = self.rng.integers(10, 21, len(boards)) * TICK_RATE
+
+    def random_free(self, boards):
+        # Случайная свободная клетка на каждом из полей: максимум случайных ключей по свободным клеткам.
+        # Появления редкие, поэтому O(клеток) на появляющийся предмет дешевле, чем поддерживать списки
+        keys = self.rng.random((len(boards), self.cells))
+        keys[self.occupied[boards]] = -1
+        for items in (self.food, self.poison, self.potion):
+            placed = items[boards] >= 0
+            keys[np.nonzero(placed)[0], items[boards][placed]] = -1
+        cells = keys.argmax(1)
+        return np.where(keys[np.arange(len(boards)), cells] >= 0, cells, -1)
+
+    def pop_tail(self, boards):
+        tail = self.body[boards, (self.head_index[boards] - self.length[boards] + 1) % self.cells]
+        self.occupied[boards, tail] = False
+        self.length[boards] -= 1
+
+    def update_items(self, boards):
+        tick = self.tick[boards]
+        spawn = boards[(self.poison[boards] < 0) & (tick >= self.poison_spawn[boards])]
+        if len(spawn):
+            cells = self.poison[spawn] = self.random_free(spawn)
+            failed = spawn[cells < 0]
+            self.poison_spawn[failed] = self.tick[failed] + self.rng.integers(15, 26, len(failed)) * TICK_RATE
+        expire = boards[(self.potion[boards] >= 0) & (tick >= self.potion_expire[boards])]
+        self.potion[expire] = -1
+        self.potion_spawn[expire] = self.tick[expire] + self.rng.integers(10, 21, len(expire)) * TICK_RATE
+        spawn = boards[(self.potion[boards] < 0) & (tick >= self.potion_spawn[boards])]
+        if len(spawn):
+            cells = self.potion[spawn] = self.random_free(spawn)
+            failed, spawned = spawn[cells < 0], spawn[cells >= 0]
+            self.potion_spawn[failed] = self.tick[failed] + self.rng.integers(10, 21, len(failed)) * TICK_RATE
+            self.potion_expire[spawned] = self.tick[spawned] + self.rng.integers(5 * TICK_RATE, 8 * TICK_RATE + 1,
+                                                                                  len(spawned))
+
+    def step(self, actions, observe=True):
+        # actions — массив из N действий; возвращает (счёт, живые, наблюдения).
+        # Поле, на котором игра закончилась, при auto_reset сразу начинается заново — alive для него False
+        actions = np.asarray(actions)
+        boards = self.rows[self.alive]
+        action = actions[boards]
+        self.direction[boards] = np.where(action == OPPOSITE[self.direction[boards]], self.direction[boards], action)
+        self.tick[boards] += self.move_delay[boards]
+        self.update_items(boards)
+
+        head = self.body[boards, self.head_index[boards]]
+        x = head % self.grid_size + DX[self.direction[boards]]
+        y = head // self.grid_size + DY[self.direction[boards]]
+        inside = (x >= 0) & (x < self.grid_size) & (y >= 0) & (y < self.grid_size)
+        new_head = np.where(inside, y * self.grid_size + x, 0)
+        crashed = ~inside | self.occupied[boards, new_head]
+        self.alive[boards[crashed]] = False
+        boards, new_head = boards[~crashed], new_head[~crashed]
+
+        self.head_index[boards] = (self.head_index[boards] + 1) % self.cells
+        self.body[boards, self.head_index[boards]] = new_head
+        self.occupied[boards, new_head] = True
+        self.length[boards] += 1
+        self.pop_tail(boards[self.length[boards] > self.grow_to[boards]])
+
+        ended = boards[(self.speed_end[boards] > 0) & (self.tick[boards] > self.speed_end[boards])]
+        self.speed_end[ended], self.move_delay[ended] = 0, MOVE_DELAY
+
+        eaten = boards[new_head == self.food[boards]]
+        self.grow_to[eaten] += 1
+        self.score[eaten] += 10
+        self.food[eaten] = -1
+        self.food[eaten] = self.random_free(eaten)
+        full = eaten[self.food[eaten] < 0]
+        self.alive[full] = False
+        self.board_full[full] = True
+
+        poisoned = boards[new_head == self.poison[boards]]
+        shrink = poisoned[self.grow_to[poisoned] > 1]
+        self.grow_to[shrink] -= 1
+        self.score[shrink] = np.maximum(0, self.score[shrink] - 5)
+        self.pop_tail(shrink[self.length[shrink] > self.grow_to[shrink]])
+        self.poison[poisoned] = -1
+        self.poison_spawn[poisoned] = self.tick[poisoned] + self.rng.integers(15, 26, len(poisoned)) * TICK_RATE
+
+        boosted = boards[new_head == self.potion[boards]]
+        self.speed_end[boosted] = self.tick[boosted] + SPEED_EFFECT_TICKS
+        self.move_delay[boosted] = np.maximum(MIN_MOVE_DELAY, self.move_delay[boosted] // 2)
+        self.potion[boosted] = -1
+        self.potion_spawn[boosted] = self.tick[boosted] + self.rng.integers(10, 21, len(boosted)) * TICK_RATE
+
+        score, alive = self.score.copy(), self.alive.copy()
+        if self.auto_reset:
+            self.reset(~self.alive)
+        return score, alive, self.observe() if observe else None
+
+    def observe(self):
+        obs = self.occupied.astype(np.int8) * BODY
+        obs[self.rows, self.body[self.rows, self.head_index]] = HEAD
+        for items, value in ((self.food, FOOD), (self.poison, POISON), (self.potion, POTION)):
+            placed = self.rows[items >= 0]
+            obs[placed, items[placed]] = value
+        return obs.reshape(self.n, self.grid_size, self.grid_size)
@@ -0,0 +1,129 @@
+import os, sys, json, time, argparse
+
+# Бенчмарки работают без дисплея
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from snakeCore import Simulation, FreeCells
+from snakeAutopilot import hamiltonian_cycle
+
+def long_snake(grid_size, length, seed=0):
+    # Симуляция со змейкой заданной длины, уложенной вдоль гамильтонова цикла
+    sim = Simulation(seed, grid_size)
+    cycle = hamiltonian_cycle(grid_size)
+    following = {cycle[i]: cycle[(i+1) % len(cycle)] for i in range(len(cycle))}
+    snake = sim.snake
+    while snake.positions:
+        snake.pop_tail()
+    for pos in cycle[:length]:
+        snake.push_head(pos)
+    for item in (sim.food, sim.poison, sim.speed_potion):
+        if item.position is not None and snake.occupies(item.position):
+            item.randomize_position()
+    head, nxt = snake.get_head_position(), following[snake.get_head_position()]
+    snake.direction = snake.next_direction = (nxt[0] - head[0], nxt[1] - head[1])
+    snake.grow_to = length
+    return sim, following
+
+def bench_simulation(grid_size, length, moves):
+    sim, following = long_snake(grid_size, length)
+    snake = sim.snake
+    start, done = time.perf_counter(), 0
+    while done < moves:
+        head = snake.get_head_position()
+        nxt = following[head]
+        snake.next_direction = (nxt[0] - head[0], nxt[1] - head[1])
+        if not sim.step():
+            break
+        done += 1
+    return done / (time.perf_counter() - start)
+
+def bench_spawn(grid_size, free, spawns):
+    # Худшая задержка появления еды, когда на поле осталось free свободных клеток
+    sim = Simulation(0, grid_size)
+    cells = FreeCells(grid_size)
+    for cell in range(grid_size * grid_size - free):
+        cells.remove((cell % grid_size, cell // grid_size))
+    food, worst = sim.food, 0.0
+    food.free_cells = cells
+    for _ in range(spawns):
+        start = time.perf_counter()
+        food.randomize_position()
+        worst = max(worst, time.perf_counter() - start)
+        cells.add(food.position)
+    return worst * 1e6
+
+def bench_snake_draw(cell_size, length, frames):
+    import pygame, snakeGame
+    surface = pygame.Surface((cell_size * 64, cell_size * 64))
+    sim, _ = long_snake(64, length)
+    view = snakeGame.SnakeView(snakeGame.SpriteCache(cell_size))
+    view.draw(surface, sim.snake, 0.5, 0, 0)
+    start = time.perf_counter()
+    for i in range(frames):
+        view.draw(surface, sim.snake, i / frames, 0, 0)
+    return (time.perf_counter() - start) / frames * 1000
+
+def bench_game_draw(length, frames):
+    import pygame, snakeGame
+    game = snakeGame.Game()
+    game.sim, _ = long_snake(snakeGame.GRID_SIZE, length)
+    game.snake = game.sim.snake
+    game.full_redraw = True
+    game.draw()
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+def run(quick=False):
+    scale = 0.1 if quick else 1.0
+    results = {}
+
+    def record(name, value, unit, higher_is_better):
+        results[name] = {"value": round(value, 3), "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:40} {value:14.3f} {unit}", flush=True)
+
+    for grid_size in (16, 64, 256):
+        for length in (4, grid_size * grid_size // 4, grid_size * grid_size * 3 // 4):
+            record(f"sim/grid{grid_size}/len{length}", bench_simulation(grid_size, length, int(50000 * scale)),
+                   "moves/s", True)
+    for grid_size, free in ((16, 1), (256, 1), (256, 16)):
+        record(f"spawn/grid{grid_size}/free{free}", bench_spawn(grid_size, free, int(20000 * scale)), "us max", False)
+    for cell_size in (20, 40):
+        for length in (10, 500):
+            record(f"snake_draw/cell{cell_size}/len{length}", bench_snake_draw(cell_size, length, int(300 * scale)),
+                   "ms/frame", False)
+    for length in (10, 200):
+        record(f"game_draw/len{length}", bench_game_draw(length, int(300 * scale)), "ms/frame", False)
+    return results
+
+def compare(results, baseline, tolerance):
+    # Регрессия — результат хуже базового больше чем на tolerance
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["value"] / baseline[name]["value"] if baseline[name]["value"] else 1.0
+        worse = ratio < 1 - tolerance if result["higher_is_better"] else ratio > 1 + tolerance
+        print(f"{name:40} {ratio:7.2f}x {'РЕГРЕССИЯ' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки змейки без дисплея")
+    parser.add_argument("--quick", action="store_true", help="в 10 раз меньше итераций")
+    parser.add_argument("--output", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="сравнить с сохранёнными результатами")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,313 @@
+import random
+from array import array
+from collections import deque
+
+# Правила змейки без pygame и без реального времени: всё считается в тиках
+GRID_SIZE, TICK_RATE = 16, 40
+MOVE_DELAY, MIN_MOVE_DELAY = max(1, round(0.15 * TICK_RATE)), max(1, round(0.05 * TICK_RATE))
+SPEED_EFFECT_TICKS = 3 * TICK_RATE
+UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+class FreeCells:
+    # Свободные клетки: плотный список + индекс клетки в нём, выбор/вставка/удаление за O(1)
+    def __init__(self, grid_size=GRID_SIZE):
+        self.grid_size = grid_size
+        self.cells = list(range(grid_size * grid_size))
+        self.index = array('l', self.cells)  # -1 — клетка занята
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, pos):
+        return self.index[pos[1]*self.grid_size + pos[0]] >= 0
+
+    def add(self, pos):
+        self.add_cell(pos[1]*self.grid_size + pos[0])
+
+    def remove(self, pos):
+        self.remove_cell(pos[1]*self.grid_size + pos[0])
+
+    def pick(self, rng):
+        cell = self.pick_cell(rng)
+        return None if cell is None else (cell % self.grid_size, cell // self.grid_size)
+
+    # Те же операции по номеру клетки (y*grid_size + x) — для кода, который хранит клетки числами
+    def add_cell(self, cell):
+        if self.index[cell] < 0:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def remove_cell(self, cell):
+        i = self.index[cell]
+        if i < 0:
+            return
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i], self.index[last] = last, i
+        self.index[cell] = -1
+
+    def pick_cell(self, rng):
+        return self.cells[rng.randrange(len(self.cells))] if self.cells else None
+
+class Snake:
+    def __init__(self, grid_size=GRID_SIZE, free_cells=None):
+        self.grid_size, self.free_cells = grid_size, free_cells
+        self.reset()
+
+    def reset(self, tick=0):
+        # Тело — дека от головы к хвосту, занятость клеток — bytearray размером с поле
+        self.positions = deque()
+        self.occupied = bytearray(self.grid_size * self.grid_size)
+        self.push_head((self.grid_size//2, self.grid_size//2))
+        self.direction = self.next_direction = RIGHT
+        self.score = self.grow_to = 0
+        self.alive, self.last_move_tick, self.move_delay = True, tick, MOVE_DELAY
+        self.death = None  # "wall" или "self" — обо что разбилась змейка
+        self.speed_effect_end = 0
+        self.last_tail = None  # клетка, которую хвост освободил последней (для интерполяции)
+
+    def get_head_position(self):
+        return self.positions[0]
+
+    def occupies(self, pos):
+        return self.occupied[pos[1]*self.grid_size + pos[0]] == 1
+
+    def push_head(self, pos):
+        self.positions.appendleft(pos)
+        self.occupied[pos[1]*self.grid_size + pos[0]] = 1
+        if self.free_cells is not None:
+            self.free_cells.remove(pos)
+
+    def pop_tail(self):
+        tail = self.last_tail = self.positions.pop()
+        self.occupied[tail[1]*self.grid_size + tail[0]] = 0
+        if self.free_cells is not None:
+            self.free_cells.add(tail)
+        return tail
+
+    def turn(self, direction):
+        # True, если направление на следующий ход действительно поменялось
+        if direction == OPPOSITE[self.direction] or direction == self.next_direction:
+            return False
+        self.next_direction = direction
+        return True
+
+    def move_progress(self, tick):
+        return min(1.0, (tick - self.last_move_tick) / self.move_delay)
+
+    def update(self, tick):
+        if tick - self.last_move_tick < self.move_delay:
+            return True
+
+        self.direction = self.next_direction
+        self.last_move_tick = tick
+        self.last_tail = None
+
+        head = self.get_head_position()
+        new_pos = (head[0] + self.direction[0], head[1] + self.direction[1])
+
+        # Проверка столкновений
+        if (new_pos[0] < 0 or new_pos[0] >= self.grid_size or
+            new_pos[1] < 0 or new_pos[1] >= self.grid_size):
+            self.alive, self.death = False, "wall"
+            return False
+        if self.occupies(new_pos):
+            self.alive, self.death = False, "self"
+            return False
+
+        self.push_head(new_pos)
+        if len(self.positions) > self.grow_to:
+            self.pop_tail()
+
+        # Проверяем окончание эффекта скорости
+        if self.speed_effect_end > 0 and tick > self.speed_effect_end:
+            self.speed_effect_end = 0
+            self.move_delay = MOVE_DELAY
+
+        return True
+
+    def activate_speed_effect(self, tick, duration=SPEED_EFFECT_TICKS):
+        self.speed_effect_end = tick + duration
+        self.move_delay = max(MIN_MOVE_DELAY, self.move_delay // 2)
+
+    def speed_active(self, tick):
+        return tick < self.speed_effect_end
+
+    def grow(self):
+        self.grow_to += 1
+        self.score += 10
+
+    def shrink(self):
+        if self.grow_to > 1:
+            self.grow_to -= 1
+            self.score = max(0, self.score - 5)
+            if len(self.positions) > self.grow_to:
+                self.pop_tail()
+
+class Food:
+    def __init__(self, rng, free_cells):
+        self.rng, self.free_cells, self.position = rng, free_cells, None
+        self.randomize_position()
+
+    def randomize_position(self):
+        # Предмет появляется только на свободной клетке; False — свободных клеток нет
+        self.position = self.free_cells.pick(self.rng)
+        if self.position is None:
+            return False
+        self.free_cells.remove(self.position)
+        return True
+
+class Poison(Food):
+    def __init__(self, rng, free_cells):
+        self.rng, self.free_cells, self.position = rng, free_cells, None
+        self.active = False
+        self.schedule(0)
+
+    def schedule(self, tick):
+        # Интервал разыгрывается один раз, а не на каждом кадре
+        self.spawn_tick = tick + self.rng.randint(15, 25) * TICK_RATE
+
+    def update(self, tick):
+        if not self.active and tick >= self.spawn_tick:
+            if self.randomize_position():
+                self.active = True
+            else:
+                self.schedule(tick)
+
+    def consume(self, tick):
+        self.active = False
+        self.schedule(tick)
+
+class SpeedPotion(Food):
+    def __init__(self, rng, free_cells):
+        self.rng, self.free_cells, self.position = rng, free_cells, None
+        self.active, self.expire_tick = False, 0
+        self.schedule(0)
+
+    def schedule(self, tick):
+        self.spawn_tick = tick + self.rng.randint(10, 20) * TICK_RATE
+
+    def update(self, tick):
+        if not self.active:
+            if tick >= self.spawn_tick:
+                if not self.randomize_position():
+                    self.schedule(tick)
+                    return
+                self.active = True
+                self.expire_tick = tick + self.rng.randint(5 * TICK_RATE, 8 * TICK_RATE)
+        elif tick >= self.expire_tick:
+            # Зелье исчезло само — его клетка снова свободна
+            self.free_cells.add(self.position)
+            self.consume(tick)
+
+    def consume(self, tick):
+        self.active = False
+        self.schedule(tick)
+
+    def next_event_tick(self):
+        return self.expire_tick if self.active else self.spawn_tick
+
+class FixedTimestep:
+    # Фиксированный шаг: переводит реальное время кадра в целое число тиков.
+    # После подвисания догоняет не больше max_catch_up тиков, лишнее время отбрасывается
+    def __init__(self, tick_rate=TICK_RATE, max_catch_up=TICK_RATE):
+        self.tick_time, self.max_catch_up = 1 / tick_rate, max_catch_up
+        self.accumulator, self.last_time = 0.0, None
+
+    def advance(self, now):
+        if self.last_time is not None:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+        ticks = int(self.accumulator / self.tick_time)
+        if ticks > self.max_catch_up:
+            ticks, self.accumulator = self.max_catch_up, self.max_catch_up * self.tick_time
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+    def hold(self, now):
+        # Время на паузе не накапливается
+        self.last_time = now
+
+    @property
+    def alpha(self):
+        # Доля пути до следующего тика — для интерполяции при отрисовке
+        return min(1.0, self.accumulator / self.tick_time)
+
+class Simulation:
+    def __init__(self, seed=None, grid_size=GRID_SIZE):
+        self.grid_size = grid_size
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed, self.rng, self.tick = seed, random.Random(seed), 0
+        self.free_cells = FreeCells(self.grid_size)
+        self.snake = Snake(self.grid_size, self.free_cells)
+        self.food = Food(self.rng, self.free_cells)
+        self.poison = Poison(self.rng, self.free_cells)
+        self.speed_potion = SpeedPotion(self.rng, self.free_cells)
+        self.game_over = self.board_full = False
+        self.eaten = dict.fromkeys(("food", "poison", "potion"), 0)  # сколько предметов съедено за партию
+
+    def update(self):
+        # Один тик симуляции; возвращает False, если игра окончена
+        if self.game_over:
+            return False
+        self.tick += 1
+        tick, snake = self.tick, self.snake
+
+        self.poison.update(tick)
+        self.speed_potion.update(tick)
+
+        if not snake.update(tick):
+            self.game_over = True
+            return False
+
+        head = snake.get_head_position()
+        if head == self.food.position:
+            snake.grow()
+            self.eaten["food"] += 1
+            if not self.food.randomize_position():
+                # Еде некуда появиться — поле заполнено, игра заканчивается
+                self.game_over = self.board_full = True
+                return False
+
+        if self.poison.active and head == self.poison.position:
+            snake.shrink()
+            self.poison.consume(tick)
+            self.eaten["poison"] += 1
+
+        if self.speed_potion.active and head == self.speed_potion.position:
+            snake.activate_speed_effect(tick)
+            self.speed_potion.consume(tick)
+            self.eaten["potion"] += 1
+        return True
+
+    def next_event_tick(self):
+        # Ближайший тик, на котором что-то может измениться
+        ticks = [self.snake.last_move_tick + self.snake.move_delay, self.speed_potion.next_event_tick()]
+        if not self.poison.active:
+            ticks.append(self.poison.spawn_tick)
+        return max(self.tick + 1, min(ticks))
+
+    def step(self):
+        # Пропускаем пустые тики и продвигаемся до следующего хода змейки
+        while not self.game_over:
+            self.tick = self.next_event_tick() - 1
+            self.update()
+            if self.snake.last_move_tick == self.tick:
+                break
+        return not self.game_over
+
+    def advance_to(self, tick):
+        # Доходит до указанного тика, тоже пропуская пустые
+        while self.tick < tick and not self.game_over:
+            self.tick = min(self.next_event_tick(), tick) - 1
+            self.update()
+        return not self.game_over
+
+    def run(self, ticks):
+        for _ in range(ticks):
+            if not self.update():
+                break
+        return not self.game_over
@@ -1,151 +1,200 @@
-import pygame, sys, random, math, time
+import time
+STARTED = time.perf_counter()  # отсюда считается время до первого кадра
+import pygame, sys, os, random, math, re, json
+from collections import OrderedDict
+from itertools import chain, islice
+from snakeCore import Simulation, FixedTimestep, GRID_SIZE, TICK_RATE, UP, DOWN, LEFT, RIGHT
+from snakeProfiler import FrameProfiler, NullProfiler
+from snakeReplay import ReplayRecorder, ReplayPlayer
+from snakeAutopilot import Autopilot
 
-# Инициализация
-pygame.init()
-GRID_SIZE, MIN_CELL_SIZE, HEADER_HEIGHT, FPS = 16, 40, 60, 60
+MIN_CELL_SIZE, HEADER_HEIGHT = 40, 60
+RENDER_FPS, VSYNC = 60, False  # RENDER_FPS = 0 — без ограничения; скорость игры от них не зависит
+REPLAY_DIR = os.environ.get("SNAKE_REPLAYS")  # папка, куда сохранять записи законченных партий
+PROFILE = os.environ.get("SNAKE_PROFILE")  # путь .csv/.json: профилировать кадры и сохранить замеры при выходе
+AUTOPILOT = bool(os.environ.get("SNAKE_AUTOPILOT"))  # начинать с включённым автопилотом (O переключает)
+DIRTY_RECTS = True  # обновлять на экране только изменившиеся прямоугольники вместо flip()
+FONT_CACHE = os.environ.get("SNAKE_FONT_CACHE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "snake_game", "fonts.json"))
+WARMUP_BUDGET = 0.002  # сколько секунд за кадр можно тратить на заготовку спрайтов после первого кадра
 BACKGROUND, GRID_COLOR = (15, 30, 15), (30, 60, 30)
 SNAKE_COLOR, SNAKE_HEAD_COLOR = (40, 180, 40), (0, 230, 80)
 SPEED_COLOR, SPEED_HEAD_COLOR = (255, 215, 0), (255, 235, 100)
 FOOD_COLOR, POISON_COLOR, SPEED_POTION_COLOR = (220, 50, 50), (150, 0, 200), (50, 150, 255)
+FOOD_HIGHLIGHT_COLOR = (255, 180, 180)
 HEADER_COLOR, TEXT_COLOR, ACCENT_COLOR = (20, 40, 20), (220, 240, 220), (0, 180, 150)
-UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
 
-class Snake:
+SNAKE_SCHEMES = {
+    # голова, тело, блик, точки-чешуйки
+    False: (SNAKE_HEAD_COLOR, SNAKE_COLOR, (30, 200, 70), (30, 160, 30)),      # Зелёный цвет точек без скорости
+    True: (SPEED_HEAD_COLOR, SPEED_COLOR, (255, 245, 150), (255, 215, 100)),   # Золотистый цвет точек при скорости
+}
+
+font_cache = None  # содержимое FONT_CACHE, читается один раз за процесс
+
+def load_font(name, size, bold=False):
+    # SysFont на Linux перебирает все шрифты системы через fc-list — это самая долгая часть запуска.
+    # Найденный файл (и нужен ли искусственный жирный) запоминается на диске, дальше шрифт открывается сразу
+    global font_cache
+    if font_cache is None:
+        try:
+            with open(FONT_CACHE) as file:
+                # Ненайденные шрифты на диске не храним: вдруг их потом установят
+                font_cache = {key: value for key, value in json.load(file).items() if value[0] is not None}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            font_cache = {}
+    cache = font_cache
+    key = f"{name}:{bold}"
+    if key not in cache or cache[key][0] is not None and not os.path.exists(cache[key][0]):
+        # Путь ищет сам SysFont, а шрифт из него создаётся ниже
+        cache[key] = pygame.font.SysFont(name, size, bold, constructor=lambda path, _, synthetic_bold, __: [path, synthetic_bold])
+        if cache[key][0] is not None:
+            try:
+                os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+                with open(FONT_CACHE, "w") as file:
+                    json.dump({key: value for key, value in cache.items() if value[0] is not None}, file)
+            except OSError:
+                pass  # кэш не записать (например, только чтение) — в следующий раз поищем снова
+    path, synthetic_bold = cache[key]
+    font = pygame.font.Font(path, size)
+    font.set_bold(synthetic_bold)
+    return font
+
+class SpriteCache:
+    # Поверхности строятся один раз и дальше только блитятся; при смене cell_size кэш сбрасывается
+    PULSE_PHASES, ROTATION_PHASES, BUBBLE_VARIANTS = 16, 12, 4
+    
     def __init__(self, cell_size):
-        self.cell_size = cell_size
-        self.reset()
-        
-    def reset(self):
-        self.positions = [(GRID_SIZE//2, GRID_SIZE//2)]
-        self.direction = self.next_direction = RIGHT
-        self.score = self.grow_to = 0
-        self.alive, self.last_move_time, self.move_delay = True, time.time(), 0.15
-        self.speed_effect_end = 0
-        self.old_positions = self.positions.copy()
-        self.move_progress = 0.0
-        
-    def get_head_position(self): 
-        return self.positions[0]
+        self.cell_size, self.sprites = cell_size, {}
     
-    def update(self, delta_time):
-        if time.time() - self.last_move_time < self.move_delay: 
-            self.move_progress = min(1.0, (time.time() - self.last_move_time) / self.move_delay)
-            return True
-        
-        self.direction = self.next_direction
-        self.last_move_time = time.time()
-        self.move_progress = 0.0
-        self.old_positions = self.positions.copy()
-        
-        head = self.get_head_position()
-        new_pos = (head[0] + self.direction[0], head[1] + self.direction[1])
-        
-        # Проверка столкновений
-        if (new_pos[0] < 0 or new_pos[0] >= GRID_SIZE or 
-            new_pos[1] < 0 or new_pos[1] >= GRID_SIZE or
-            new_pos in self.positions[1:]):
-            self.alive = False
-            return False
-        
-        self.positions.insert(0, new_pos)
-        if len(self.positions) > self.grow_to: 
-            self.positions.pop()
-            
-        # Проверяем окончание эффекта скорости
-        if self.speed_effect_end > 0 and time.time() > self.speed_effect_end:
-            self.speed_effect_end = 0
-            self.move_delay = 0.15
-            
-        return True
-    
-    def activate_speed_effect(self, duration=3.0):
-        self.speed_effect_end = time.time() + duration
-        self.move_delay = max(0.05, self.move_delay * 0.5)
-    
-    def grow(self):
-        self.grow_to += 1
-        self.score += 10
-    
-    def shrink(self):
-        if self.grow_to > 1:
-            self.grow_to -= 1
-            self.score = max(0, self.score - 5)
-            if len(self.positions) > self.grow_to: 
-                self.positions.pop()
-    
-    def draw(self, surface, offset_x, offset_y):
-        # Определяем цвета в зависимости от эффекта скорости
-        if time.time() < self.speed_effect_end:
-            head_color = SPEED_HEAD_COLOR
-            body_color = SPEED_COLOR
-            highlight_color = (255, 245, 150)
-            scale_color = (255, 215, 100)  # Золотистый цвет точек при скорости
+    def resize(self, cell_size):
+        if cell_size != self.cell_size:
+            self.cell_size, self.sprites = cell_size, {}
+    
+    def get(self, key, build, size):
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = pygame.Surface(size, pygame.SRCALPHA)
+            build(sprite, *key[1:])
+        return sprite
+    
+    def pulse_phase(self, pulse):
+        return int(pulse / (2 * math.pi) * self.PULSE_PHASES) % self.PULSE_PHASES
+    
+    def phase_pulse(self, phase):
+        return phase * 2 * math.pi / self.PULSE_PHASES
+
+class TextCache:
+    # Готовые поверхности текста по (шрифт, строка, цвет, сглаживание) с вытеснением LRU
+    PARTS = re.compile(r"\d|\D+")
+    
+    def __init__(self, max_size=256):
+        self.max_size, self.surfaces = max_size, OrderedDict()
+    
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = font.render(text, antialias, color)
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
         else:
-            head_color = SNAKE_HEAD_COLOR
-            body_color = SNAKE_COLOR
-            highlight_color = (30, 200, 70)
-            scale_color = (30, 160, 30)  # Зелёный цвет точек без скорости
-        
-        for i, pos in enumerate(self.positions):
+            self.surfaces.move_to_end(key)
+        return surface
+    
+    def blit(self, surface, font, text, color, pos, align="left", antialias=True):
+        # Цифры берутся отдельными глифами, остальное — целыми кусками, так что
+        # меняющийся счёт не растеризует строку заново
+        parts = [self.render(font, part, color, antialias) for part in self.PARTS.findall(text)]
+        width = sum(part.get_width() for part in parts)
+        x, y = pos
+        if align == "center":
+            x -= width//2
+        elif align == "right":
+            x -= width
+        rect = pygame.Rect(x, y, width, max((part.get_height() for part in parts), default=0))
+        for part in parts:
+            x += surface.blit(part, (x, y)).width
+        return rect
+
+class SnakeView:
+    def __init__(self, sprites):
+        self.sprites = sprites
+    
+    def build_head(self, surface, speed, direction):
+        head_color, _, highlight_color, _ = SNAKE_SCHEMES[speed]
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, head_color, rect, border_radius=8)
+        highlight = pygame.Rect(rect.x+2, rect.y+2, rect.width-4, rect.height-4)
+        pygame.draw.rect(surface, highlight_color, highlight, border_radius=6)
+        
+        eye_size, eye_offset = rect.width//6, rect.width//3
+        eye_pos = {
+            RIGHT: [(rect.right - eye_offset, rect.top + eye_offset), 
+                   (rect.right - eye_offset, rect.bottom - eye_offset)],
+            LEFT: [(rect.left + eye_offset, rect.top + eye_offset), 
+                  (rect.left + eye_offset, rect.bottom - eye_offset)],
+            UP: [(rect.left + eye_offset, rect.top + eye_offset), 
+                (rect.right - eye_offset, rect.top + eye_offset)],
+            DOWN: [(rect.left + eye_offset, rect.bottom - eye_offset), 
+                  (rect.right - eye_offset, rect.bottom - eye_offset)]
+        }[direction]
+        
+        for eye in eye_pos:
+            pygame.draw.circle(surface, (255, 255, 255), eye, eye_size)
+            pygame.draw.circle(surface, (0, 0, 0), eye, eye_size//2)
+        
+        if direction in (LEFT, RIGHT):
+            tongue_x = rect.centerx + (rect.width//3 if direction == RIGHT else -rect.width//3)
+            pygame.draw.rect(surface, (255, 0, 0), (tongue_x-2, rect.centery-3, 4, 6), border_radius=2)
+    
+    def build_body(self, surface, speed):
+        _, body_color, _, scale_color = SNAKE_SCHEMES[speed]
+        segment = surface.get_rect().inflate(-4, -4)
+        pygame.draw.rect(surface, body_color, segment, border_radius=6)
+        scale_size = surface.get_width()//3
+        for y in range(segment.top + scale_size//2, segment.bottom, scale_size):
+            for x in range(segment.left + scale_size//2, segment.right, scale_size):
+                pygame.draw.circle(surface, scale_color, (x, y), scale_size//3)
+    
+    def draw(self, surface, snake, tick, offset_x, offset_y):
+        # Спрайты зависят от эффекта скорости и направления головы
+        cell_size, speed = self.sprites.cell_size, snake.speed_active(tick)
+        size = (cell_size, cell_size)
+        head = self.sprites.get(('head', speed, snake.direction), self.build_head, size)
+        body = self.sprites.get(('body', speed), self.build_body, size)
+        
+        move_progress, rects = snake.move_progress(tick), []
+        # Прошлая клетка сегмента — это текущая клетка следующего за ним, копировать тело не нужно
+        old_positions = chain(islice(snake.positions, 1, None), (snake.last_tail,))
+        for i, (pos, old_pos) in enumerate(zip(snake.positions, old_positions)):
             # Плавная интерполяция позиций
-            if i < len(self.old_positions):
-                old_pos = self.old_positions[i]
-                interp_x = old_pos[0] + (pos[0] - old_pos[0]) * self.move_progress
-                interp_y = old_pos[1] + (pos[1] - old_pos[1]) * self.move_progress
+            if old_pos is not None:
+                interp_x = old_pos[0] + (pos[0] - old_pos[0]) * move_progress
+                interp_y = old_pos[1] + (pos[1] - old_pos[1]) * move_progress
             else:
                 interp_x, interp_y = pos
-                
-            rect = pygame.Rect(offset_x + interp_x * self.cell_size, 
-                               offset_y + interp_y * self.cell_size, 
-                               self.cell_size, self.cell_size)
             
-            if i == 0:  # Голова
-                pygame.draw.rect(surface, head_color, rect, border_radius=8)
-                highlight = pygame.Rect(rect.x+2, rect.y+2, rect.width-4, rect.height-4)
-                pygame.draw.rect(surface, highlight_color, highlight, border_radius=6)
-                
-                eye_size, eye_offset = self.cell_size//6, self.cell_size//3
-                eye_pos = {
-                    RIGHT: [(rect.right - eye_offset, rect.top + eye_offset), 
-                           (rect.right - eye_offset, rect.bottom - eye_offset)],
-                    LEFT: [(rect.left + eye_offset, rect.top + eye_offset), 
-                          (rect.left + eye_offset, rect.bottom - eye_offset)],
-                    UP: [(rect.left + eye_offset, rect.top + eye_offset), 
-                        (rect.right - eye_offset, rect.top + eye_offset)],
-                    DOWN: [(rect.left + eye_offset, rect.bottom - eye_offset), 
-                          (rect.right - eye_offset, rect.bottom - eye_offset)]
-                }[self.direction]
-                
-                for eye in eye_pos:
-                    pygame.draw.circle(surface, (255, 255, 255), eye, eye_size)
-                    pygame.draw.circle(surface, (0, 0, 0), eye, eye_size//2)
-                
-                if self.direction in (LEFT, RIGHT):
-                    tongue_x = rect.centerx + (rect.width//3 if self.direction == RIGHT else -rect.width//3)
-                    pygame.draw.rect(surface, (255, 0, 0), (tongue_x-2, rect.centery-3, 4, 6), border_radius=2)
-            else:  # Тело
-                segment = rect.inflate(-4, -4)
-                pygame.draw.rect(surface, body_color, segment, border_radius=6)
-                scale_size = self.cell_size//3
-                for y in range(segment.top + scale_size//2, segment.bottom, scale_size):
-                    for x in range(segment.left + scale_size//2, segment.right, scale_size):
-                        pygame.draw.circle(surface, scale_color, (x, y), scale_size//3)
+            rects.append(surface.blit(head if i == 0 else body,
+                                      (int(offset_x + interp_x * cell_size), int(offset_y + interp_y * cell_size))))
+        return rects
 
-class Food:
-    def __init__(self, cell_size):
-        self.cell_size, self.position, self.pulse = cell_size, (0, 0), 0
-        self.randomize_position()
+class FoodView:
+    def __init__(self, sprites):
+        self.sprites, self.pulse = sprites, 0
     
-    def randomize_position(self):
-        self.position = (random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1))
+    def update(self, delta_time=0): 
+        self.pulse = (self.pulse + delta_time * 6) % (2 * math.pi)
     
-    def update(self): 
-        self.pulse = (self.pulse + 0.1) % (2 * math.pi)
+    def blit(self, surface, sprite, position, offset_x, offset_y):
+        # Спрайты предметов вдвое больше клетки, чтобы влезли лист и лучи
+        cell_size = self.sprites.cell_size
+        return surface.blit(sprite, (offset_x + position[0]*cell_size - cell_size//2,
+                              offset_y + position[1]*cell_size - cell_size//2))
     
-    def draw(self, surface, offset_x, offset_y, color, highlight_color):
-        cx = offset_x + self.position[0]*self.cell_size + self.cell_size//2
-        cy = offset_y + self.position[1]*self.cell_size + self.cell_size//2
-        radius = self.cell_size//2 - 3 + math.sin(self.pulse)*2
+    def build(self, surface, phase, color, highlight_color):
+        cx = cy = surface.get_width()//2
+        radius = self.sprites.cell_size//2 - 3 + math.sin(self.sprites.phase_pulse(phase))*2
         
         pygame.draw.circle(surface, color, (cx, cy), radius)
         pygame.draw.circle(surface, highlight_color, (cx - radius//3, cy - radius//3), radius//3)
@@ -155,69 +204,58 @@ class Food:
                    (cx + radius//2, cy - radius - radius//3)]
             pygame.draw.polygon(surface, (80, 200, 80), leaf)
             pygame.draw.line(surface, (100, 70, 30), (cx, cy - radius), (cx, cy - radius//2), 2)
+    
+    def draw(self, surface, food, offset_x, offset_y, color, highlight_color):
+        if food.position is None: return
+        size = (self.sprites.cell_size*2, self.sprites.cell_size*2)
+        key = ('food', self.sprites.pulse_phase(self.pulse), color, highlight_color)
+        return self.blit(surface, self.sprites.get(key, self.build, size), food.position, offset_x, offset_y)
 
-class Poison(Food):
-    def __init__(self, cell_size):
-        super().__init__(cell_size)
-        self.active, self.spawn_timer = False, 0
-        
-    def update(self, delta_time):
-        super().update()
-        if not self.active:
-            self.spawn_timer += delta_time
-            if self.spawn_timer > random.randint(15, 25):
-                self.active, self.spawn_timer = True, 0
-                self.randomize_position()
-    
-    def draw(self, surface, offset_x, offset_y):
-        if not self.active: return
-        cx = offset_x + self.position[0]*self.cell_size + self.cell_size//2
-        cy = offset_y + self.position[1]*self.cell_size + self.cell_size//2
-        height = self.cell_size//2 + math.sin(self.pulse)*2
+class PoisonView(FoodView):
+    def build(self, surface, phase, variant):
+        cell_size = self.sprites.cell_size
+        cx = cy = surface.get_width()//2
+        height = cell_size//2 + math.sin(self.sprites.phase_pulse(phase))*2
         
-        bottle = pygame.Rect(cx - self.cell_size//4, cy - height//2, self.cell_size//2, height)
+        bottle = pygame.Rect(cx - cell_size//4, cy - height//2, cell_size//2, height)
         pygame.draw.rect(surface, POISON_COLOR, bottle, border_radius=8)
         
-        neck = pygame.Rect(cx - self.cell_size//8, cy - height//2 - self.cell_size//6, 
-                          self.cell_size//4, self.cell_size//6)
+        neck = pygame.Rect(cx - cell_size//8, cy - height//2 - cell_size//6, 
+                          cell_size//4, cell_size//6)
         pygame.draw.rect(surface, POISON_COLOR, neck, border_radius=4)
         
+        # Пузырьки случайные, поэтому на каждую фазу заготовлено несколько вариантов
+        bubbles = random.Random(phase * self.sprites.BUBBLE_VARIANTS + variant)
         for _ in range(5):
-            bubble = (random.randint(bottle.left+5, bottle.right-5), 
-                     random.randint(bottle.top+5, bottle.bottom-5))
-            pygame.draw.circle(surface, (200, 230, 255), bubble, random.randint(2,4))
+            bubble = (bubbles.randint(bottle.left+5, bottle.right-5), 
+                     bubbles.randint(bottle.top+5, bottle.bottom-5))
+            pygame.draw.circle(surface, (200, 230, 255), bubble, bubbles.randint(2,4))
+    
+    def draw(self, surface, poison, offset_x, offset_y):
+        if not poison.active: return
+        size = (self.sprites.cell_size*2, self.sprites.cell_size*2)
+        key = ('poison', self.sprites.pulse_phase(self.pulse), random.randrange(self.sprites.BUBBLE_VARIANTS))
+        return self.blit(surface, self.sprites.get(key, self.build, size), poison.position, offset_x, offset_y)
 
-class SpeedPotion(Food):
-    def __init__(self, cell_size):
-        super().__init__(cell_size)
-        self.active, self.spawn_timer, self.lifetime = False, 0, 0
+class SpeedPotionView(FoodView):
+    def __init__(self, sprites):
+        super().__init__(sprites)
         self.rotation = 0
         
-    def update(self, delta_time):
-        super().update()
+    def update(self, delta_time=0):
+        super().update(delta_time)
         self.rotation = (self.rotation + delta_time * 100) % 360
-        
-        if not self.active:
-            self.spawn_timer += delta_time
-            if self.spawn_timer > random.randint(10, 20):
-                self.active, self.spawn_timer = True, 0
-                self.lifetime = random.uniform(5.0, 8.0)
-                self.randomize_position()
-        elif self.active:
-            self.lifetime -= delta_time
-            if self.lifetime <= 0:
-                self.active = False
-    
-    def draw(self, surface, offset_x, offset_y):
-        if not self.active: return
-        cx = offset_x + self.position[0]*self.cell_size + self.cell_size//2
-        cy = offset_y + self.position[1]*self.cell_size + self.cell_size//2
-        radius = self.cell_size//3 + math.sin(self.pulse)*3
+    
+    def build(self, surface, phase, rotation_phase):
+        cx = cy = surface.get_width()//2
+        radius = self.sprites.cell_size//3 + math.sin(self.sprites.phase_pulse(phase))*3
+        # Четыре луча симметричны, так что достаточно поворотов в пределах 90°
+        rotation = rotation_phase * 90 / self.sprites.ROTATION_PHASES
         
         pygame.draw.circle(surface, SPEED_POTION_COLOR, (cx, cy), radius)
         
         for i in range(4):
-            angle = math.radians(self.rotation + i * 90)
+            angle = math.radians(rotation + i * 90)
             start_x = cx + math.cos(angle) * (radius * 0.7)
             start_y = cy + math.sin(angle) * (radius * 0.7)
             end_x = cx + math.cos(angle) * (radius * 1.2)
@@ -225,10 +263,26 @@ class SpeedPotion(Food):
             pygame.draw.line(surface, (255, 255, 255), (start_x, start_y), (end_x, end_y), 3)
         
         pygame.draw.circle(surface, (180, 230, 255), (cx - radius//3, cy - radius//3), radius//4)
+    
+    def draw(self, surface, potion, offset_x, offset_y):
+        if not potion.active: return
+        size = (self.sprites.cell_size*2, self.sprites.cell_size*2)
+        rotation_phase = int(self.rotation % 90 / 90 * self.sprites.ROTATION_PHASES)
+        key = ('potion', self.sprites.pulse_phase(self.pulse), rotation_phase)
+        return self.blit(surface, self.sprites.get(key, self.build, size), potion.position, offset_x, offset_y)
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    def __init__(self, replay=None):
+        self.replay = replay  # байты записи: тогда змейкой управляет запись, а не игрок
+        # Только то, чем игра пользуется: без звука и джойстиков запуск быстрее
+        pygame.display.init()
+        pygame.font.init()
+        if VSYNC:
+            # vsync в pygame работает только вместе с SCALED
+            self.screen = pygame.display.set_mode(pygame.display.get_desktop_sizes()[0],
+                                                  pygame.FULLSCREEN | pygame.SCALED, vsync=1)
+        else:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         self.screen_width, self.screen_height = self.screen.get_size()
         pygame.display.set_caption("Змейка с ядом и зельем скорости")
         
@@ -240,23 +294,66 @@ class Game:
         self.grid_y = (self.screen_height - self.grid_height)//2 + 20
         
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 36)
-        self.title_font = pygame.font.SysFont("Arial", 48, bold=True)
-        self.small_font = pygame.font.SysFont("Arial", 24)
-        
-        self.snake = Snake(self.cell_size)
-        self.food = Food(self.cell_size)
-        self.poison = Poison(self.cell_size)
-        self.speed_potion = SpeedPotion(self.cell_size)
-        self.touch_start, self.game_over, self.paused = None, False, False
-        self.last_score, self.start_time, self.last_time = 0, time.time(), time.time()
-        self.game_over_alpha = 0
+        self.fonts = (load_font("Arial", 36), load_font("Arial", 48, bold=True), load_font("Arial", 24))
+        self.text, self.show_profiler = TextCache(), False
+        self.autopilot = Autopilot(GRID_SIZE) if AUTOPILOT else None
+        self.instrument(FrameProfiler(PROFILE) if PROFILE else NullProfiler())
+        
+        self.sprites = SpriteCache(self.cell_size)
+        self.snake_view = SnakeView(self.sprites)
+        self.food_view = FoodView(self.sprites)
+        self.poison_view = PoisonView(self.sprites)
+        self.speed_potion_view = SpeedPotionView(self.sprites)
+        self.touch_start, self.last_score = None, 0
+        self.background = self.build_background()
+        # Одно затемнение на все кадры: прозрачность задаётся set_alpha, а не новой SRCALPHA-поверхностью
+        self.overlay = pygame.Surface((self.screen_width, self.screen_height)).convert()
+        self.overlay.fill((0, 0, 0))
+        # Первый кадр рисует только то, что на нём видно; остальные спрайты заготавливаются после него
+        self.warmup, self.first_frame_time = self.warm_up(), None
+        self.reset_game()
+    
+    def instrument(self, profiler):
+        # Отрисовка идёт через canvas и обёрнутые шрифты, чтобы профайлер мог их посчитать
+        self.profiler, self.canvas = profiler, profiler.wrap(self.screen)
+        self.font, self.title_font, self.small_font = (profiler.wrap(font) for font in self.fonts)
+    
+    def warm_up(self):
+        # Генератор: каждый шаг строит один спрайт или глиф, чтобы заготовка делилась между кадрами
+        cell, double = (self.cell_size, self.cell_size), (self.cell_size * 2, self.cell_size * 2)
+        for speed in (False, True):
+            for direction in (UP, DOWN, LEFT, RIGHT):
+                yield self.sprites.get(('head', speed, direction), self.snake_view.build_head, cell)
+            yield self.sprites.get(('body', speed), self.snake_view.build_body, cell)
+        for phase in range(SpriteCache.PULSE_PHASES):
+            yield self.sprites.get(('food', phase, FOOD_COLOR, FOOD_HIGHLIGHT_COLOR), self.food_view.build, double)
+            for variant in range(SpriteCache.BUBBLE_VARIANTS):
+                yield self.sprites.get(('poison', phase, variant), self.poison_view.build, double)
+            for rotation in range(SpriteCache.ROTATION_PHASES):
+                yield self.sprites.get(('potion', phase, rotation), self.speed_potion_view.build, double)
+        for text in "0123456789.":
+            yield self.text.render(self.font, text, TEXT_COLOR)
+            yield self.text.render(self.font, text, SPEED_HEAD_COLOR)
+
+    def first_frame_shown(self):
+        self.first_frame_time = time.perf_counter() - STARTED
+        print(f"Первый кадр через {self.first_frame_time * 1000:.0f} мс", flush=True)
+
+    def warm(self, budget):
+        deadline = time.perf_counter() + budget
+        while self.warmup is not None and time.perf_counter() < deadline:
+            if next(self.warmup, None) is None:
+                self.warmup = None
+
+    def quit(self):
+        self.profiler.export()
+        pygame.quit()
+        sys.exit()
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT: 
-                pygame.quit()
-                sys.exit()
+                self.quit()
             elif event.type == pygame.FINGERDOWN: 
                 self.touch_start = (event.x*self.screen_width, event.y*self.screen_height)
             elif event.type == pygame.FINGERUP: 
@@ -264,126 +361,182 @@ class Game:
                     self.handle_swipe((event.x*self.screen_width, event.y*self.screen_height))
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE: 
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+                if event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                    if self.show_profiler and not self.profiler.enabled:
+                        self.instrument(FrameProfiler())
+                    elif not self.show_profiler and not PROFILE:
+                        # Без SNAKE_PROFILE замеры нужны только для HUD: закрыли — вернули голый экран и шрифты
+                        self.profiler.close()
+                        self.instrument(NullProfiler())
+                    continue
+                if event.key == pygame.K_o:
+                    self.autopilot = None if self.autopilot else Autopilot(GRID_SIZE)
+                    continue
                 if self.game_over: 
                     self.reset_game()
                 else:
                     if event.key == pygame.K_p: 
                         self.paused = not self.paused
-                    elif event.key in (pygame.K_w, pygame.K_UP) and self.snake.direction != DOWN: 
-                        self.snake.next_direction = UP
-                    elif event.key in (pygame.K_s, pygame.K_DOWN) and self.snake.direction != UP: 
-                        self.snake.next_direction = DOWN
-                    elif event.key in (pygame.K_a, pygame.K_LEFT) and self.snake.direction != RIGHT: 
-                        self.snake.next_direction = LEFT
-                    elif event.key in (pygame.K_d, pygame.K_RIGHT) and self.snake.direction != LEFT: 
-                        self.snake.next_direction = RIGHT
+                        self.recorder.pause(self.sim.tick)
+                    elif event.key in (pygame.K_w, pygame.K_UP): 
+                        self.turn(UP)
+                    elif event.key in (pygame.K_s, pygame.K_DOWN): 
+                        self.turn(DOWN)
+                    elif event.key in (pygame.K_a, pygame.K_LEFT): 
+                        self.turn(LEFT)
+                    elif event.key in (pygame.K_d, pygame.K_RIGHT): 
+                        self.turn(RIGHT)
             elif event.type == pygame.MOUSEBUTTONDOWN and self.game_over: 
                 self.reset_game()
     
+    def turn(self, direction):
+        if self.player is None and self.snake.turn(direction):
+            self.recorder.turn(self.sim.tick, direction)
+    
     def handle_swipe(self, touch_end):
         if not self.touch_start or self.game_over or self.paused: 
             return
             
         dx, dy = touch_end[0]-self.touch_start[0], touch_end[1]-self.touch_start[1]
         if abs(dx) > abs(dy): 
-            if dx > 50 and self.snake.direction != LEFT: 
-                self.snake.next_direction = RIGHT
-            elif dx < -50 and self.snake.direction != RIGHT: 
-                self.snake.next_direction = LEFT
+            if dx > 50: 
+                self.turn(RIGHT)
+            elif dx < -50: 
+                self.turn(LEFT)
         else:
-            if dy > 50 and self.snake.direction != UP: 
-                self.snake.next_direction = DOWN
-            elif dy < -50 and self.snake.direction != DOWN: 
-                self.snake.next_direction = UP
+            if dy > 50: 
+                self.turn(DOWN)
+            elif dy < -50: 
+                self.turn(UP)
                 
         self.touch_start = None
     
-    def update(self):
-        current_time = time.time()
-        delta_time = current_time - self.last_time
-        self.last_time = current_time
+    def update(self, now):
+        # now — единственное чтение часов за кадр, его же использует draw
+        delta_time, self.now = now - self.now, now
         
         if self.game_over: 
-            self.game_over_alpha = min(self.game_over_alpha+5, 180)
+            self.game_over_alpha = min(self.game_over_alpha + delta_time*300, 180)
             return
         if self.paused: 
+            self.timestep.hold(now)
             return
             
-        self.food.update()
-        self.poison.update(delta_time)
-        self.speed_potion.update(delta_time)
-        
-        if not self.snake.update(delta_time):
-            self.game_over = True
-            self.last_score = self.snake.score
-            return
-            
-        head = self.snake.get_head_position()
-        if head == self.food.position:
-            while True:
-                self.food.randomize_position()
-                if (self.food.position != self.poison.position or not self.poison.active) and \
-                   self.food.position != self.speed_potion.position and \
-                   self.food.position not in self.snake.positions: 
-                    break
-            self.snake.grow()
-        
-        if self.poison.active and head == self.poison.position:
-            self.snake.shrink()
-            self.poison.active = False
-            
-        if self.speed_potion.active and head == self.speed_potion.position:
-            self.snake.activate_speed_effect()
-            self.speed_potion.active = False
+        self.food_view.update(delta_time)
+        self.poison_view.update(delta_time)
+        self.speed_potion_view.update(delta_time)
+        
+        # Симуляция идёт фиксированными тиками независимо от частоты кадров
+        for _ in range(self.timestep.advance(now)):
+            if self.player is not None:
+                self.player.apply(self.sim)
+            elif self.autopilot is not None and self.sim.tick + 1 - self.snake.last_move_tick >= self.snake.move_delay:
+                # Автопилот решает только перед тиком с ходом; его повороты пишутся в запись как обычные
+                direction = self.autopilot.decide(self.sim)
+                if direction is not None:
+                    self.turn(direction)
+            if self.player is not None and self.player.finished or not self.sim.update():
+                self.end_game()
+                return
     
-    def draw(self):
-        self.screen.fill(BACKGROUND)
-        pygame.draw.rect(self.screen, HEADER_COLOR, (0, 0, self.screen_width, HEADER_HEIGHT))
-        pygame.draw.line(self.screen, ACCENT_COLOR, (0, HEADER_HEIGHT), (self.screen_width, HEADER_HEIGHT), 3)
-        
-        score_text = self.font.render(f"Счет: {self.snake.score}", True, TEXT_COLOR)
-        self.screen.blit(score_text, (30, 15))
-        
-        elapsed = int(time.time() - self.start_time)
-        time_text = self.font.render(f"Время: {elapsed} сек", True, TEXT_COLOR)
-        self.screen.blit(time_text, (self.screen_width - time_text.get_width() - 30, 15))
-        
-        if self.snake.speed_effect_end > time.time():
-            time_left = max(0, self.snake.speed_effect_end - time.time())
-            speed_text = self.font.render(f"Скорость: {time_left:.1f}с", True, SPEED_HEAD_COLOR)
-            self.screen.blit(speed_text, (self.screen_width//2 - speed_text.get_width()//2, 15))
+    def end_game(self):
+        self.game_over = True
+        self.last_score = self.snake.score
+        self.recorder.end(self.sim.tick)
+        if REPLAY_DIR and self.player is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.sim.seed}.snkr")
+            with open(path, "wb") as file:
+                file.write(self.recorder.getvalue())
+    
+    def build_background(self):
+        # Всё статичное рисуется один раз: фон, шапка, сетка, рамка и подсказка по управлению
+        background = pygame.Surface((self.screen_width, self.screen_height)).convert()
+        background.fill(BACKGROUND)
+        pygame.draw.rect(background, HEADER_COLOR, (0, 0, self.screen_width, HEADER_HEIGHT))
+        pygame.draw.line(background, ACCENT_COLOR, (0, HEADER_HEIGHT), (self.screen_width, HEADER_HEIGHT), 3)
         
         for x in range(0, self.grid_width, self.cell_size):
-            pygame.draw.line(self.screen, GRID_COLOR, (self.grid_x+x, self.grid_y), (self.grid_x+x, self.grid_y+self.grid_height))
+            pygame.draw.line(background, GRID_COLOR, (self.grid_x+x, self.grid_y), (self.grid_x+x, self.grid_y+self.grid_height))
         for y in range(0, self.grid_height, self.cell_size):
-            pygame.draw.line(self.screen, GRID_COLOR, (self.grid_x, self.grid_y+y), (self.grid_x+self.grid_width, self.grid_y+y))
-        
-        pygame.draw.rect(self.screen, ACCENT_COLOR, (self.grid_x-4, self.grid_y-4, self.grid_width+8, self.grid_height+8), 4, border_radius=8)
+            pygame.draw.line(background, GRID_COLOR, (self.grid_x, self.grid_y+y), (self.grid_x+self.grid_width, self.grid_y+y))
         
-        self.food.draw(self.screen, self.grid_x, self.grid_y, FOOD_COLOR, (255, 180, 180))
-        self.poison.draw(self.screen, self.grid_x, self.grid_y)
-        self.speed_potion.draw(self.screen, self.grid_x, self.grid_y)
-        self.snake.draw(self.screen, self.grid_x, self.grid_y)
+        pygame.draw.rect(background, ACCENT_COLOR, (self.grid_x-4, self.grid_y-4, self.grid_width+8, self.grid_height+8), 4, border_radius=8)
+        self.draw_controls(background)
+        return background
+    
+    def draw_controls(self, surface):
+        controls_text = self.text.render(self.font, "WASD/Свайпы | P - Пауза | O - Автопилот", (180, 220, 180))
+        surface.blit(controls_text, (self.screen_width//2 - controls_text.get_width()//2, self.screen_height-40))
+    
+    def draw(self):
+        # Возвращает список прямоугольников для display.update или None, если нужен полный flip
+        overlay = ('game_over', int(self.game_over_alpha)) if self.game_over else ('paused', 150) if self.paused else None
+        if overlay is not None and overlay == self.drawn_overlay:
+            return []  # под неизменным затемнением обновлять нечего
+        
+        full = not DIRTY_RECTS or self.full_redraw or overlay is not None
+        if full:
+            self.canvas.blit(self.background, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                self.canvas.blit(self.background, rect, rect)
+        self.profiler.mark("draw_background")
+        rects = self.draw_scene()
         
+        self.drawn_overlay, self.full_redraw = overlay, overlay is not None
         if self.game_over: 
             self.draw_game_over()
         elif self.paused: 
             self.draw_paused()
-        
-        controls_text = self.font.render("WASD/Свайпы | P - Пауза", True, (180, 220, 180))
-        self.screen.blit(controls_text, (self.screen_width//2 - controls_text.get_width()//2, self.screen_height-40))
+        if overlay is not None:
+            self.draw_controls(self.canvas)
+        if self.show_profiler:
+            rects += self.draw_profiler()
+        self.profiler.mark("draw_overlay")
+        
+        updated, self.dirty_rects = self.dirty_rects + rects, rects
+        return None if full else updated
+    
+    def draw_scene(self):
+        rects = [self.text.blit(self.canvas, self.font, f"Счет: {self.snake.score}", TEXT_COLOR, (30, 15))]
+        
+        elapsed = int(self.now - self.start_time)
+        rects.append(self.text.blit(self.canvas, self.font, f"Время: {elapsed} сек", TEXT_COLOR,
+                                    (self.screen_width - 30, 15), align="right"))
+        
+        if self.autopilot is not None and self.player is None:
+            rects.append(self.text.blit(self.canvas, self.small_font, "Автопилот", ACCENT_COLOR,
+                                        (30, HEADER_HEIGHT + 8)))
+        if self.snake.speed_active(self.sim.tick):
+            time_left = (self.snake.speed_effect_end - self.sim.tick) / TICK_RATE
+            rects.append(self.text.blit(self.canvas, self.font, f"Скорость: {time_left:.1f}с", SPEED_HEAD_COLOR,
+                                        (self.screen_width//2, 15), align="center"))
+        self.profiler.mark("draw_hud")
+        
+        rects += [self.food_view.draw(self.canvas, self.sim.food, self.grid_x, self.grid_y, FOOD_COLOR, FOOD_HIGHLIGHT_COLOR),
+                  self.poison_view.draw(self.canvas, self.sim.poison, self.grid_x, self.grid_y),
+                  self.speed_potion_view.draw(self.canvas, self.sim.speed_potion, self.grid_x, self.grid_y)]
+        rects = [rect for rect in rects if rect is not None]
+        self.profiler.mark("draw_items")
+        rects += self.snake_view.draw(self.canvas, self.snake, self.sim.tick + self.timestep.alpha, self.grid_x, self.grid_y)
+        self.profiler.mark("draw_snake")
+        return rects
+    
+    def draw_profiler(self):
+        return [self.text.blit(self.canvas, self.small_font, line, TEXT_COLOR, (20, self.screen_height - 70 + i*28))
+                for i, line in enumerate(self.profiler.hud_lines())]
     
     def draw_game_over(self):
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, self.game_over_alpha))
-        self.screen.blit(overlay, (0, 0))
+        self.overlay.set_alpha(int(self.game_over_alpha))
+        self.canvas.blit(self.overlay, (0, 0))
         
         texts = [
-            self.title_font.render("ИГРА ОКОНЧЕНА!", True, (200, 50, 50)),
-            self.font.render(f"Ваш счет: {self.last_score}", True, TEXT_COLOR),
-            self.font.render("Кликните для новой игры", True, ACCENT_COLOR)
+            self.text.render(self.title_font, "ИГРА ОКОНЧЕНА!", (200, 50, 50)),
+            self.text.render(self.font, f"Ваш счет: {self.last_score}", TEXT_COLOR),
+            self.text.render(self.font, "Кликните для новой игры", ACCENT_COLOR)
         ]
         
         msg_width = max(t.get_width() for t in texts) + 80
@@ -392,34 +545,55 @@ class Game:
         pygame.draw.rect(self.screen, ACCENT_COLOR, msg_rect, 3, border_radius=15)
         
         for i, text in enumerate(texts):
-            self.screen.blit(text, (self.screen_width//2 - text.get_width()//2, 
+            self.canvas.blit(text, (self.screen_width//2 - text.get_width()//2, 
                                   self.screen_height//2 - 60 + i*60))
     
     def draw_paused(self):
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        self.screen.blit(overlay, (0, 0))
+        self.overlay.set_alpha(150)
+        self.canvas.blit(self.overlay, (0, 0))
         
-        paused = self.title_font.render("ПАУЗА", True, TEXT_COLOR)
-        self.screen.blit(paused, (self.screen_width//2 - paused.get_width()//2, self.screen_height//2-30))
-        continue_text = self.font.render("Нажмите P для продолжения", True, ACCENT_COLOR)
-        self.screen.blit(continue_text, (self.screen_width//2 - continue_text.get_width()//2, self.screen_height//2+30))
+        paused = self.text.render(self.title_font, "ПАУЗА", TEXT_COLOR)
+        self.canvas.blit(paused, (self.screen_width//2 - paused.get_width()//2, self.screen_height//2-30))
+        continue_text = self.text.render(self.font, "Нажмите P для продолжения", ACCENT_COLOR)
+        self.canvas.blit(continue_text, (self.screen_width//2 - continue_text.get_width()//2, self.screen_height//2+30))
     
     def reset_game(self):
-        self.snake = Snake(self.cell_size)
-        self.food = Food(self.cell_size)
-        self.poison = Poison(self.cell_size)
-        self.speed_potion = SpeedPotion(self.cell_size)
+        # Сид всегда известен, чтобы партию можно было записать и воспроизвести
+        self.player = ReplayPlayer(self.replay) if self.replay else None
+        if self.player is not None:
+            if self.player.grid_size != GRID_SIZE:
+                raise ValueError(f"запись сделана на поле {self.player.grid_size}, а не {GRID_SIZE}")
+            self.sim = Simulation(self.player.seed, GRID_SIZE)
+        else:
+            self.sim = Simulation(random.getrandbits(32))
+        self.recorder = ReplayRecorder(self.sim.seed, GRID_SIZE)
+        self.snake = self.sim.snake
         self.game_over, self.paused, self.game_over_alpha = False, False, 0
-        self.start_time, self.last_time = time.time(), time.time()
+        self.timestep = FixedTimestep()
+        self.full_redraw, self.drawn_overlay, self.dirty_rects = True, None, []
+        self.start_time = self.now = time.perf_counter()
+        self.timestep.hold(self.now)
     
     def run(self):
         while True:
+            profiler = self.profiler
+            profiler.begin_frame()
             self.handle_events()
-            self.update()
-            self.draw()
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            profiler.mark("handle_events")
+            self.update(time.perf_counter())
+            profiler.mark("update")
+            rects = self.draw()
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+            profiler.mark("display")
+            if self.first_frame_time is None:
+                self.first_frame_shown()
+            self.warm(WARMUP_BUDGET)
+            self.clock.tick(0 if VSYNC else RENDER_FPS)
+            profiler.mark("idle")
+            profiler.end_frame()
 
 if __name__ == "__main__":
     game = Game()
@@ -0,0 +1,135 @@
+import pygame, time, json, csv
+from collections import deque
+
+# Встроенный профайлер кадра. Выключенный профайлер — NullProfiler с пустыми методами,
+# поэтому в обычной игре замеры почти ничего не стоят
+PHASES = ["handle_events", "update", "draw_background", "draw_hud", "draw_items", "draw_snake",
+          "draw_overlay", "display", "idle"]
+
+class NullProfiler:
+    enabled = False
+
+    def begin_frame(self): pass
+    def mark(self, phase): pass
+    def end_frame(self): pass
+    def wrap(self, target): return target
+    def export(self): pass
+    def close(self): pass
+
+class Counted:
+    # Обёртка над экраном или шрифтом: blit считается отрисовкой, render — новой поверхностью,
+    # всё остальное уходит к настоящему объекту
+    def __init__(self, target, profiler):
+        self.target, self.profiler = target, profiler
+
+    def blit(self, *args, **kwargs):
+        self.profiler.draw_calls += 1
+        return self.target.blit(*args, **kwargs)
+
+    def render(self, *args, **kwargs):
+        self.profiler.allocations += 1
+        return self.target.render(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+# Подмена pygame.draw и pygame.Surface ставится один раз на процесс и считает в пользу активного
+# профайлера; uninstall возвращает оригиналы, так что после закрытия профайлера обёрток не остаётся
+DRAW_FUNCTIONS = ("rect", "line", "lines", "circle", "polygon", "ellipse", "arc", "aaline", "aalines")
+originals, active = {}, None
+
+def install(profiler):
+    global active
+    active = profiler
+    if originals:
+        return
+    originals.update({name: getattr(pygame.draw, name) for name in DRAW_FUNCTIONS}, Surface=pygame.Surface)
+
+    def counted(draw):
+        def wrapper(*args, **kwargs):
+            if active is not None:
+                active.draw_calls += 1
+            return draw(*args, **kwargs)
+        return wrapper
+
+    for name in DRAW_FUNCTIONS:
+        setattr(pygame.draw, name, counted(originals[name]))
+
+    class Surface(originals["Surface"]):
+        def __init__(self, *args, **kwargs):
+            if active is not None:
+                active.allocations += 1
+            super().__init__(*args, **kwargs)
+
+    pygame.Surface = Surface
+
+def uninstall(profiler):
+    global active
+    if active is not profiler or not originals:
+        return
+    for name in DRAW_FUNCTIONS:
+        setattr(pygame.draw, name, originals[name])
+    pygame.Surface = originals["Surface"]
+    originals.clear()
+    active = None
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, export_path=None, window=600):
+        # Замеры копятся только для выгрузки: профайлер, открытый клавишей F3, живёт в постоянной памяти
+        self.export_path, self.samples = export_path, [] if export_path else None
+        self.frame_times = deque(maxlen=window)
+        self.draw_calls = self.allocations = 0
+        self.phases, self.start = dict.fromkeys(PHASES, 0.0), 0.0
+        self.last, self.last_sample = time.perf_counter(), None
+        install(self)
+
+    def close(self):
+        uninstall(self)
+
+    def wrap(self, target):
+        return Counted(target, self)
+
+    def begin_frame(self):
+        self.start = self.last = time.perf_counter()
+        self.draw_calls = self.allocations = 0
+        for phase in self.phases:
+            self.phases[phase] = 0.0
+
+    def mark(self, phase):
+        # Время с прошлой отметки записывается на счёт фазы
+        now = time.perf_counter()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        frame_time = self.last - self.start
+        self.frame_times.append(frame_time)
+        self.last_sample = (frame_time, *self.phases.values(), self.draw_calls, self.allocations)
+        if self.samples is not None:
+            self.samples.append(self.last_sample)
+
+    def percentiles(self):
+        times = sorted(self.frame_times)
+        if not times:
+            return 0.0, 0.0, 0.0
+        return tuple(times[min(len(times)-1, int(len(times) * q))] for q in (0.5, 0.95, 0.99))
+
+    def hud_lines(self):
+        p50, p95, p99 = (t * 1000 for t in self.percentiles())
+        last = self.last_sample or (0.0,) * (len(PHASES) + 3)
+        return [f"кадр p50 {p50:.2f} p95 {p95:.2f} p99 {p99:.2f} мс",
+                f"отрисовок {last[-2]} | новых поверхностей {last[-1]}"]
+
+    def export(self):
+        if not self.export_path:
+            return
+        columns = ["frame_time", *PHASES, "draw_calls", "allocations"]
+        with open(self.export_path, "w", newline="") as file:
+            if self.export_path.endswith(".json"):
+                json.dump([dict(zip(columns, sample)) for sample in self.samples], file)
+            else:
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                writer.writerows(self.samples)
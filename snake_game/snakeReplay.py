@@ -0,0 +1,128 @@
+import sys, hashlib, argparse
+from snakeCore import Simulation, UP, DOWN, LEFT, RIGHT
+
+# Запись партии: сид + события по тикам. Каждое событие — один varint (разница тиков << 3 | код),
+# обычный поворот занимает 1–2 байта
+MAGIC, VERSION = b"SNKR", 1
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT]
+PAUSE, END = 4, 5
+MIN_GRID, MAX_GRID = 2, 4096  # записи приходят извне: поле другого размера — не наша запись или подделка
+
+def write_varint(data, value):
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("запись обрывается посреди числа")
+        byte = data[pos]
+        value |= (byte & 0x7F) << shift
+        pos += 1
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class ReplayRecorder:
+    def __init__(self, seed, grid_size):
+        self.data, self.last_tick = bytearray(MAGIC), 0
+        self.data.append(VERSION)
+        write_varint(self.data, grid_size)
+        write_varint(self.data, seed)
+
+    def record(self, tick, code):
+        write_varint(self.data, (tick - self.last_tick) << 3 | code)
+        self.last_tick = tick
+
+    def turn(self, tick, direction):
+        self.record(tick, DIRECTIONS.index(direction))
+
+    def pause(self, tick):
+        self.record(tick, PAUSE)
+
+    def end(self, tick):
+        self.record(tick, END)
+
+    def getvalue(self):
+        return bytes(self.data)
+
+def read_replay(data):
+    # Возвращает (размер поля, сид, [(тик, код), ...])
+    if len(data) < 5 or data[:4] != MAGIC or data[4] != VERSION:
+        raise ValueError("это не запись змейки или неизвестная версия")
+    grid_size, pos = read_varint(data, 5)
+    if not MIN_GRID <= grid_size <= MAX_GRID:
+        raise ValueError(f"неверный размер поля: {grid_size}")
+    seed, pos = read_varint(data, pos)
+    events, tick = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        tick += value >> 3
+        events.append((tick, value & 7))
+    return grid_size, seed, events
+
+class ReplayPlayer:
+    # Подаёт события записи в симуляцию ровно на тех тиках, где они были сделаны
+    def __init__(self, data):
+        self.grid_size, self.seed, self.events = read_replay(data)
+        self.index, self.finished = 0, False
+
+    def apply(self, sim):
+        while self.index < len(self.events) and self.events[self.index][0] <= sim.tick:
+            code = self.events[self.index][1]
+            if code < len(DIRECTIONS):
+                sim.snake.turn(DIRECTIONS[code])
+            elif code == END:
+                self.finished = True
+            self.index += 1
+
+    def next_tick(self):
+        return self.events[self.index][0] if self.index < len(self.events) else None
+
+def state_hash(sim):
+    snake = sim.snake
+    state = (sim.tick, snake.score, tuple(snake.positions), snake.direction, sim.food.position,
+             sim.poison.active and sim.poison.position, sim.speed_potion.active and sim.speed_potion.position)
+    return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+
+def verify(data):
+    # Проигрывает запись без отрисовки так быстро, как позволяют тики-события симуляции
+    player = ReplayPlayer(data)
+    sim = Simulation(player.seed, player.grid_size)
+    while not player.finished and not sim.game_over:
+        tick = player.next_tick()
+        if tick is None:
+            break
+        sim.advance_to(tick)
+        player.apply(sim)
+    if not player.finished:
+        # Запись без конца — доигрываем до смерти змейки
+        while sim.step():
+            pass
+    return {"score": sim.snake.score, "ticks": sim.tick, "game_over": sim.game_over, "hash": state_hash(sim)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Проверка и просмотр записей змейки")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--watch", action="store_true", help="показать запись в игре с обычной скоростью")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.files:
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            if args.watch:
+                from snakeGame import Game
+                Game(replay=data).run()
+            else:
+                result = verify(data)
+                print(f"{path}: счёт {result['score']}, тиков {result['ticks']}, хеш {result['hash']}")
+        except Exception as error:
+            # Записи присылают игроки: битая или обрезанная не останавливает проверку остальных
+            failed += 1
+            print(f"{path}: {type(error).__name__}: {error}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,299 @@
+import asyncio, socket, struct, random, argparse, time
+from array import array
+from collections import deque
+from snakeCore import TICK_RATE
+from snakeArena import Arena, ArenaView, UP, DOWN, LEFT, RIGHT, OPPOSITE, DX, DY, \
+    MOVE, TAIL, SPAWN, CLEAR, DIED, BORN
+from snakeReplay import write_varint, read_varint
+
+# Сетевая арена. Сервер — единственный, кто считает правила: тикает Arena и рассылает клиентам
+# только то, что изменилось за тик (события арены), а не тела целиком.
+# Кадр: 4 байта длины + 1 байт типа + тело из varint'ов.
+#   S (снимок, один раз при входе): поле, свой номер, тик, змейки (номер, длина, клетки от головы), предметы
+#   D (дельта, каждый тик с событиями): тик, затем события (код, аргументы) как в snakeArena
+# Клиент шлёт кадры из одного байта: направление 0–3 или RESPAWN
+HEADER = struct.Struct("!IB")
+RESPAWN = 4
+MAX_BUFFER = 1 << 20  # клиент, у которого не уходит мегабайт, слишком медленный — отключаем
+EVENT_ARGS = {MOVE: 2, TAIL: 1, SPAWN: 2, CLEAR: 1, DIED: 1, BORN: 2}
+
+def frame(kind, body):
+    return HEADER.pack(len(body) + 1, kind) + body
+
+def encode_delta(tick, events):
+    data = bytearray()
+    write_varint(data, tick)
+    for code, *args in events:
+        write_varint(data, code)
+        for value in args:
+            write_varint(data, abs(value))  # вид предмета в арене отрицательный, по сети идёт 1..3
+    return frame(ord("D"), data)
+
+class ArenaMirror:
+    # Копия арены на клиенте: сетка и тела, собранные из снимка и дельт; рисуется тем же ArenaView
+    def __init__(self, data):
+        pos = 0
+        self.grid_size, pos = read_varint(data, pos)
+        self.me, pos = read_varint(data, pos)
+        self.tick, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        self.grid = array('i', bytes(4 * self.grid_size * self.grid_size))
+        self.bodies = [deque() for _ in range(count)]
+        for _ in range(count):
+            i, pos = read_varint(data, pos)
+            length, pos = read_varint(data, pos)
+            for _ in range(length):
+                cell, pos = read_varint(data, pos)
+                self.bodies[i].append(cell)
+                self.grid[cell] = i + 1
+        items, pos = read_varint(data, pos)
+        for _ in range(items):
+            cell, pos = read_varint(data, pos)
+            kind, pos = read_varint(data, pos)
+            self.grid[cell] = -kind
+
+    def apply(self, data):
+        self.tick, pos = read_varint(data, 0)
+        grid, bodies = self.grid, self.bodies
+        while pos < len(data):
+            code, pos = read_varint(data, pos)
+            args = []
+            for _ in range(EVENT_ARGS[code]):
+                value, pos = read_varint(data, pos)
+                args.append(value)
+            if code == MOVE:
+                bodies[args[0]].appendleft(args[1])
+                grid[args[1]] = args[0] + 1
+            elif code == TAIL:
+                grid[bodies[args[0]].pop()] = 0
+            elif code == SPAWN:
+                grid[args[0]] = -args[1]
+            elif code == CLEAR:
+                grid[args[0]] = 0
+            elif code == DIED:
+                for cell in bodies[args[0]]:
+                    grid[cell] = 0
+                bodies[args[0]].clear()
+            elif code == BORN:
+                bodies[args[0]] = deque([args[1]])
+                grid[args[1]] = args[0] + 1
+
+class Server:
+    def __init__(self, grid_size, bots, players, food, seed=None):
+        self.arena = Arena(grid_size, bots + players, food, food // 4, food // 4, seed)
+        self.bots = bots
+        for i in range(bots, bots + players):
+            self.arena.kill(i, None)  # места игроков пустуют, пока никто не подключился
+        self.arena.events = []
+        self.free_slots = list(range(bots + players - 1, bots - 1, -1))
+        self.clients = {}  # writer -> номер змейки
+        self.snapshot = None  # (тик, тело снимка без своего номера) — один на тик, сколько бы ни вошло клиентов
+        self.sent = 0
+
+    def build_snapshot(self, me):
+        arena = self.arena
+        if self.snapshot is None or self.snapshot[0] != arena.tick:
+            snakes, items = bytearray(), bytearray()
+            write_varint(snakes, arena.count)
+            for i, body in enumerate(arena.bodies):
+                write_varint(snakes, i)
+                write_varint(snakes, len(body))
+                for cell in body:
+                    write_varint(snakes, cell)
+            cells = [(cell, -value) for cell, value in enumerate(arena.grid) if value < 0]
+            write_varint(items, len(cells))
+            for cell, kind in cells:
+                write_varint(items, cell)
+                write_varint(items, kind)
+            self.snapshot = (arena.tick, bytes(snakes + items))
+        head = bytearray()
+        for value in (arena.grid_size, me, arena.tick):
+            write_varint(head, value)
+        return frame(ord("S"), bytes(head) + self.snapshot[1])
+
+    async def handle(self, reader, writer):
+        if not self.free_slots:
+            writer.close()
+            return
+        me = self.free_slots.pop()
+        self.arena.spawn_snake(me)
+        # Снимок и регистрация без await между ними: следующая дельта придёт ровно после снимка
+        writer.write(self.build_snapshot(me))
+        self.clients[writer] = me
+        try:
+            while True:
+                length, kind = HEADER.unpack(await reader.readexactly(HEADER.size))
+                # От клиента бывают только однобайтовые кадры; всё остальное — чужой или сломанный клиент.
+                # После отключения за медленность слот может занять другой игрок — кадры из буфера не считаются
+                if length != 1 or self.clients.get(writer) != me:
+                    break
+                if kind < 4:
+                    if self.arena.alive[me]:
+                        self.arena.turn(me, kind)
+                elif kind == RESPAWN and not self.arena.alive[me]:
+                    self.arena.spawn_snake(me)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.drop(writer)
+
+    def drop(self, writer):
+        me = self.clients.pop(writer, None)
+        if me is not None:
+            if self.arena.alive[me]:
+                self.arena.kill(me, None)
+            self.free_slots.append(me)
+        writer.close()
+
+    def step(self):
+        arena = self.arena
+        for i in arena.due():
+            if i < self.bots:
+                arena.steer(i)
+        for i, cause in arena.update():
+            if i < self.bots:
+                arena.spawn_snake(i)
+        # События между тиками (вход, выход, возрождение) уходят в ту же дельту
+        events, arena.events = arena.events, []
+        if not events:
+            return
+        data = encode_delta(arena.tick, events)
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+                self.drop(writer)
+            else:
+                writer.write(data)
+                self.sent += len(data)
+
+    async def run(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"сервер на {host}:{port}, поле {self.arena.grid_size}, ботов {self.bots}", flush=True)
+        loop = asyncio.get_running_loop()
+        next_tick = report = loop.time()
+        async with server:
+            while True:
+                self.step()
+                next_tick += 1 / TICK_RATE
+                now = loop.time()
+                if now - next_tick > 1:
+                    next_tick = now  # сильно отстали — не пытаемся догнать всё сразу
+                if now - report >= 5:
+                    print(f"тик {self.arena.tick}, клиентов {len(self.clients)}, "
+                          f"{self.sent / (now - report) / 1024:.1f} КБ/с", flush=True)
+                    report, self.sent = now, 0
+                await asyncio.sleep(max(0.0, next_tick - now))
+
+class Connection:
+    # Неблокирующий сокет для клиента на pygame: читаем всё, что пришло, между кадрами
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+
+    def send(self, code):
+        self.sock.sendall(HEADER.pack(1, code))
+
+    def frames(self):
+        try:
+            while chunk := self.sock.recv(1 << 16):
+                self.buffer += chunk
+        except BlockingIOError:
+            pass
+        while len(self.buffer) >= HEADER.size:
+            length, kind = HEADER.unpack_from(self.buffer)
+            if len(self.buffer) < 4 + length:
+                break
+            body = bytes(self.buffer[HEADER.size:4 + length])
+            del self.buffer[:4 + length]
+            yield kind, body
+
+def play(host, port, cell_size):
+    import pygame
+    pygame.display.init()
+    screen = pygame.display.set_mode((1024, 768))
+    pygame.display.set_caption("Змейка: сетевая арена")
+    connection, view, clock = Connection(host, port), ArenaView(cell_size), pygame.time.Clock()
+    keys = {pygame.K_w: UP, pygame.K_UP: UP, pygame.K_s: DOWN, pygame.K_DOWN: DOWN,
+            pygame.K_a: LEFT, pygame.K_LEFT: LEFT, pygame.K_d: RIGHT, pygame.K_RIGHT: RIGHT}
+    mirror, predicted, camera = None, None, 0
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN and mirror is not None:
+                if not mirror.bodies[mirror.me]:
+                    connection.send(RESPAWN)
+                elif event.key in keys:
+                    connection.send(keys[event.key])
+                    predicted = keys[event.key]
+        for kind, body in connection.frames():
+            if kind == ord("S"):
+                mirror = ArenaMirror(body)
+            elif mirror is not None:
+                me = mirror.me
+                moved = mirror.bodies[me][0] if mirror.bodies[me] else None
+                mirror.apply(body)
+                if mirror.bodies[me] and mirror.bodies[me][0] != moved:
+                    predicted = None  # сервер подтвердил ход — предсказание больше не нужно
+        if mirror is None:
+            clock.tick(60)
+            continue
+        body, n = mirror.bodies[mirror.me], mirror.grid_size
+        if body:
+            camera = body[0]
+        x0, y0 = view.draw(screen, mirror, camera)
+        if body and predicted is not None and len(body) > 1:
+            # Предсказание ввода: клетка, куда пойдёт голова после нажатия, видна сразу, не дожидаясь сервера
+            direction = {1: RIGHT, -1: LEFT, n: DOWN, -n: UP}[body[0] - body[1]]
+            if predicted != OPPOSITE[direction]:
+                x, y = body[0] % n + DX[predicted] - x0, body[0] // n + DY[predicted] - y0
+                pygame.draw.rect(screen, (240, 250, 240), (x * cell_size, y * cell_size, cell_size - 1, cell_size - 1), 1)
+        pygame.display.flip()
+        clock.tick(60)
+
+async def load(host, port, clients, seconds):
+    # Нагрузочная проверка: много клиентов без окна, каждый читает дельты и иногда поворачивает
+    received = [0]
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        rng, turn_at = random.Random(), time.perf_counter()
+        try:
+            while True:
+                length, kind = HEADER.unpack(await reader.readexactly(HEADER.size))
+                await reader.readexactly(length - 1)
+                received[0] += length + 4
+                if time.perf_counter() >= turn_at:
+                    writer.write(HEADER.pack(1, rng.choice((UP, DOWN, LEFT, RIGHT, RESPAWN))))
+                    turn_at += rng.uniform(0.2, 1.0)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    tasks = [asyncio.create_task(client()) for _ in range(clients)]
+    await asyncio.sleep(seconds)
+    for task in tasks:
+        task.cancel()
+    print(f"{clients} клиентов: {received[0] / seconds / clients / 1024:.1f} КБ/с на клиента")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сетевая арена: сервер, клиент и нагрузочная проверка")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--connect", action="store_true", help="клиент на pygame вместо сервера")
+    parser.add_argument("--load", type=int, metavar="CLIENTS", help="подключить столько клиентов без окна")
+    parser.add_argument("--seconds", type=float, default=10, help="сколько длится --load")
+    parser.add_argument("--grid", type=int, default=256)
+    parser.add_argument("--bots", type=int, default=50)
+    parser.add_argument("--players", type=int, default=500, help="сколько мест для игроков")
+    parser.add_argument("--food", type=int, default=300)
+    parser.add_argument("--cell", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.connect:
+        play(args.host, args.port, args.cell)
+    elif args.load:
+        asyncio.run(load(args.host, args.port, args.load, args.seconds))
+    else:
+        asyncio.run(Server(args.grid, args.bots, args.players, args.food).run(args.host, args.port))
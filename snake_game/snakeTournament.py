@@ -0,0 +1,125 @@
+import json, time, random, argparse
+from collections import Counter
+from itertools import product
+from multiprocessing import Pool, cpu_count
+from snakeCore import Simulation, GRID_SIZE, UP, DOWN, LEFT, RIGHT, OPPOSITE
+from snakeAutopilot import Autopilot
+
+# Турнир: тысячи партий без отрисовки на всех ядрах. Каждая партия — (стратегия, поле, сид),
+# результаты приходят по мере готовности и сразу сводятся в статистику
+DEATHS = ["wall", "self", "full", "timeout"]
+
+class RandomPolicy:
+    # Базовая линия: случайный ход из тех, что не разбивают змейку прямо сейчас
+    def __init__(self, grid_size, seed):
+        self.rng = random.Random(seed)
+
+    def decide(self, sim):
+        snake = sim.snake
+        x, y = snake.get_head_position()
+        options = [d for d in (UP, DOWN, LEFT, RIGHT) if d != OPPOSITE[snake.direction]
+                   and 0 <= x + d[0] < sim.grid_size and 0 <= y + d[1] < sim.grid_size
+                   and not snake.occupies((x + d[0], y + d[1]))]
+        return self.rng.choice(options) if options else None
+
+POLICIES = {
+    # Без бюджета времени автопилот всегда досчитывает BFS — партия воспроизводима по сиду
+    "autopilot": lambda grid_size, seed: Autopilot(grid_size, budget=float("inf")),
+    "random": RandomPolicy,
+}
+
+def play(job):
+    policy_name, grid_size, seed, max_ticks = job
+    sim = Simulation(seed, grid_size)
+    policy = POLICIES[policy_name](grid_size, seed)
+    while sim.tick < max_ticks:
+        direction = policy.decide(sim)
+        if direction is not None:
+            sim.snake.turn(direction)
+        if not sim.step():
+            break
+    death = "full" if sim.board_full else sim.snake.death if sim.game_over else "timeout"
+    return {"policy": policy_name, "grid": grid_size, "seed": seed, "score": sim.snake.score, "ticks": sim.tick,
+            "length": len(sim.snake.positions), "death": death, **sim.eaten}
+
+class Stats:
+    def __init__(self):
+        self.games, self.scores, self.deaths = 0, Counter(), Counter()
+        self.ticks, self.min_ticks, self.max_ticks = 0, None, 0
+        self.eaten = Counter()
+
+    def add(self, result):
+        self.games += 1
+        self.scores[result["score"]] += 1
+        self.deaths[result["death"]] += 1
+        self.ticks += result["ticks"]
+        self.min_ticks = result["ticks"] if self.min_ticks is None else min(self.min_ticks, result["ticks"])
+        self.max_ticks = max(self.max_ticks, result["ticks"])
+        for item in ("food", "poison", "potion"):
+            self.eaten[item] += result[item]
+
+    def percentile(self, q):
+        # Перцентиль счёта по гистограмме, без хранения всех результатов
+        rank, seen = q * (self.games - 1), 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen > rank:
+                return score
+        return 0
+
+    def summary(self):
+        games = self.games or 1
+        return {"games": self.games,
+                "score": {"mean": sum(s * c for s, c in self.scores.items()) / games,
+                          "p10": self.percentile(0.1), "p50": self.percentile(0.5), "p90": self.percentile(0.9),
+                          "max": max(self.scores, default=0)},
+                "ticks": {"mean": self.ticks / games, "min": self.min_ticks or 0, "max": self.max_ticks},
+                "eaten": {item: self.eaten[item] / games for item in ("food", "poison", "potion")},
+                "deaths": {death: self.deaths[death] / games for death in DEATHS}}
+
+def print_table(stats, done, total, elapsed):
+    print(f"\n{done}/{total} партий за {elapsed:.1f} с ({done / max(elapsed, 1e-9):.0f} партий/с)")
+    print(f"{'стратегия':12} {'поле':>4} {'партий':>8} {'счёт p10/p50/p90':>18} {'макс':>6} {'тиков':>9} "
+          f"{'еда/яд/зелье':>16}  " + " ".join(f"{death:>7}" for death in DEATHS))
+    for (policy, grid_size), group in sorted(stats.items()):
+        s = group.summary()
+        score, eaten = s["score"], s["eaten"]
+        print(f"{policy:12} {grid_size:4} {s['games']:8} "
+              f"{score['p10']:>6}/{score['p50']}/{score['p90']:<6} {score['max']:>6} {s['ticks']['mean']:9.0f} "
+              f"{eaten['food']:6.1f}/{eaten['poison']:.1f}/{eaten['potion']:<4.1f}  "
+              + " ".join(f"{s['deaths'][death]:7.1%}" for death in DEATHS), flush=True)
+
+def seed_range(text):
+    start, _, stop = text.partition(":")
+    return range(int(start), int(stop)) if stop else range(int(start))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовые партии змейки без отрисовки на всех ядрах")
+    parser.add_argument("--seeds", type=seed_range, default=range(1000), help="N или START:STOP (по умолчанию 1000)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[GRID_SIZE])
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=sorted(POLICIES))
+    parser.add_argument("--max-ticks", type=int, default=1_000_000, help="после этого партия считается timeout")
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--report", type=float, default=2.0, help="как часто печатать промежуточную сводку, с")
+    parser.add_argument("--output", help="сохранить итоговую сводку в JSON")
+    args = parser.parse_args()
+
+    jobs = [(policy, grid_size, seed, args.max_ticks)
+            for policy, grid_size, seed in product(args.policies, args.sizes, args.seeds)]
+    # Короткие партии идут пачками, чтобы не платить за пересылку каждой; пачки мелкие, чтобы сводка шла плавно
+    chunksize = max(1, min(64, len(jobs) // (args.workers * 8)))
+    stats, start = {}, time.perf_counter()
+    last_report = start
+    with Pool(args.workers) as pool:
+        for done, result in enumerate(pool.imap_unordered(play, jobs, chunksize), 1):
+            stats.setdefault((result["policy"], result["grid"]), Stats()).add(result)
+            now = time.perf_counter()
+            if now - last_report >= args.report:
+                print_table(stats, done, len(jobs), now - start)
+                last_report = now
+    print_table(stats, len(jobs), len(jobs), time.perf_counter() - start)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({f"{policy}/{grid_size}": group.summary() for (policy, grid_size), group in sorted(stats.items())},
+                      file, indent=2)
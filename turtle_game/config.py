@@ -1,4 +1,7 @@
 settings = {
   "move_distance": 50,
-  "rotate_angle": 10
+  "rotate_angle": 10,
+  "turbo": False,
+  "frame_ms": 16,
+  "drawing_file": "drawing.strokes"
 }
\ No newline at end of file
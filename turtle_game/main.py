@@ -1,5 +1,7 @@
+import os
 import turtle
 from config import settings
+from strokes import Strokes, load
 
 screen = turtle.Screen()
 screen.title("Управляемая черепашка")
@@ -11,29 +13,76 @@ t.color("green")
 t.speed(5)
 t.pensize(3)
 
-def clear_screen():
+strokes = Strokes()  # всё нарисованное, чтобы сохранить, загрузить или выгрузить в SVG
+
+# Турбо-режим: без анимации, нажатия копятся и раз в кадр выполняются разом.
+# Подряд идущие шаги в одну сторону (и подряд идущие повороты) складываются в один, перо и очистка их разделяют.
+# Вперёд и назад не складываются: с опущенным пером это линия туда и обратно, а не шаг на месте
+pending = []
+if settings["turbo"]:
+    screen.tracer(0)
+
+def run(action, amount=None):
+    if not settings["turbo"]:
+        action() if amount is None else action(amount)
+    elif amount is not None and pending and pending[-1][0] == action and \
+            (action != move or (pending[-1][1] > 0) == (amount > 0)):
+        pending[-1][1] += amount
+    else:
+        pending.append([action, amount])
+
+def flush():
+    for action, amount in pending:
+        action() if amount is None else action(amount)
+    if pending:
+        pending.clear()
+        screen.update()
+    screen.ontimer(flush, settings["frame_ms"])
+
+def move(distance):
+    strokes.record(t, t.forward, distance)
+
+def wipe():
     t.clear()
     t.penup()
     t.home()
     t.pendown()
+    strokes.clear()
+
+def save_drawing():
+    strokes.save(settings["drawing_file"], t)
+
+def load_drawing():
+    global strokes
+    if not os.path.exists(settings["drawing_file"]):
+        return
+    wipe()
+    strokes = load(settings["drawing_file"])
+    strokes.draw(t, screen)
+
+def export_drawing():
+    strokes.to_svg(os.path.splitext(settings["drawing_file"])[0] + ".svg")
+
+def clear_screen():
+    run(wipe)
 
 def up():
-    t.forward(settings["move_distance"])
+    run(move, settings["move_distance"])
 
 def pup():
-    t.penup()
+    run(t.penup)
 
 def pdown():
-    t.pendown()
+    run(t.pendown)
 
 def tright():
-    t.right(settings["rotate_angle"])
+    run(t.left, -settings["rotate_angle"])
 
 def tleft():
-    t.left(settings["rotate_angle"])
+    run(t.left, settings["rotate_angle"])
 
 def back():
-    t.backward(settings["move_distance"])
+    run(move, -settings["move_distance"])
 
 screen.listen()
 screen.onkey(up, "Up")
@@ -43,10 +92,17 @@ screen.onkey(tright, "Right")
 screen.onkey(pup, "u")
 screen.onkey(pdown, "d")
 screen.onkey(clear_screen, "c")
+screen.onkey(lambda: run(save_drawing), "s")
+screen.onkey(lambda: run(load_drawing), "l")
+screen.onkey(lambda: run(export_drawing), "e")
 
 instruction = turtle.Turtle()
 instruction.goto(0, -350)
-instruction.write("Стрелки: движение\nU/D: поднять/опустить перо\nC: очистить экран", 
+instruction.write("Стрелки: движение\nU/D: поднять/опустить перо\nC: очистить экран\nS/L: сохранить/загрузить, E: в SVG", 
                  align="center", font=("Monocraft", 12, "normal"))
 
+if settings["turbo"]:
+    screen.update()
+    flush()
+
 screen.mainloop()
\ No newline at end of file
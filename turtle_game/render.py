@@ -0,0 +1,154 @@
+import os, sys, zlib, struct, argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import settings
+import strokes
+
+# Рисунок черепашки без Tk и экрана: команды up/back/tleft/tright/pup/pdown (по одной на слово)
+# или файл .strokes превращаются в отрезки векторно — направление это накопленная сумма поворотов,
+# положение — накопленная сумма шагов, — и растеризуются прямо в массив NumPy, который пишется в PNG
+COMMANDS = ["up", "back", "tleft", "tright", "pup", "pdown", "clear_screen"]
+COLORS = {"green": (0, 128, 0), "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+          "blue": (0, 0, 255), "yellow": (255, 255, 0), "orange": (255, 165, 0), "purple": (128, 0, 128),
+          "gray": (128, 128, 128), "brown": (165, 42, 42), "pink": (255, 192, 203)}
+PEN_COLOR, PEN_SIZE = "green", 3  # как у черепашки в main.py
+SAMPLES_PER_CHUNK = 1 << 22  # столько точек отрезков в памяти за раз
+
+def parse(text):
+    # Слова в номера команд; неизвестные слова — ошибка, а не тихо пропущенный шаг
+    words = np.array(text.split())
+    if not len(words):
+        return np.zeros(0, np.int8)
+    names, inverse = np.unique(words, return_inverse=True)
+    unknown = [name for name in names if name not in COMMANDS]
+    if unknown:
+        raise ValueError(f"неизвестные команды: {', '.join(unknown[:5])}")
+    return np.array([COMMANDS.index(name) for name in names], np.int8)[inverse]
+
+def segments(codes):
+    # (x0, y0, x1, y1) отрезков с опущенным пером. Очистка возвращает черепашку домой с опущенным пером,
+    # поэтому видно только то, что нарисовано после последней очистки
+    cleared = np.flatnonzero(codes == COMMANDS.index("clear_screen"))
+    if len(cleared):
+        codes = codes[cleared[-1] + 1:]
+    turn = np.select([codes == 2, codes == 3], [settings["rotate_angle"], -settings["rotate_angle"]], 0)
+    heading = np.radians(np.cumsum(turn, dtype=np.float64))
+    step = np.select([codes == 0, codes == 1], [settings["move_distance"], -settings["move_distance"]], 0)
+    dx, dy = step * np.cos(heading), step * np.sin(heading)
+    x1, y1 = np.cumsum(dx), np.cumsum(dy)
+    # Перо на каждой команде — последняя pup/pdown до неё (сначала опущено)
+    is_pen = (codes == 4) | (codes == 5)
+    last_pen = np.maximum.accumulate(np.where(is_pen, np.arange(len(codes)), -1))
+    down = np.where(last_pen >= 0, codes[np.maximum(last_pen, 0)] == 5, True)
+    drawn = down & (step != 0)
+    return np.stack([x1 - dx, y1 - dy, x1, y1], axis=1)[drawn]
+
+def stroke_segments(path):
+    # Отрезки из записи strokes.py, сгруппированные по (цвет, толщина)
+    recorded = strokes.load(path)
+    coords = np.frombuffer(recorded.coords, np.float32).reshape(-1, 4).astype(np.float64)
+    down = np.frombuffer(bytes(recorded.pen), np.uint8).astype(bool)
+    color, width = np.asarray(recorded.color), np.asarray(recorded.width)
+    groups = []
+    for c, w in sorted(set(zip(color[down].tolist(), width[down].tolist()))):
+        groups.append((rgb(recorded.palette[c]), w, coords[down & (color == c) & (width == w)]))
+    return groups
+
+def rgb(name):
+    if name.startswith("#") and len(name) == 7:
+        return tuple(int(name[i:i + 2], 16) for i in (1, 3, 5))
+    return COLORS.get(name.lower(), (0, 0, 0))
+
+def rasterize(mask, lines):
+    # Точки вдоль каждого отрезка примерно через пиксель; отрезки берутся порциями, чтобы не раздувать память
+    length = np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1])
+    counts = np.ceil(length).astype(np.int64) + 1
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(SAMPLES_PER_CHUNK, counts.sum(), SAMPLES_PER_CHUNK))
+    for part, part_counts in zip(np.split(lines, bounds), np.split(counts, bounds)):
+        if not len(part):
+            continue
+        index = np.repeat(np.arange(len(part)), part_counts)
+        first = np.cumsum(part_counts) - part_counts
+        t = (np.arange(part_counts.sum()) - first[index]) / np.maximum(part_counts - 1, 1)[index]
+        x = np.rint(part[index, 0] + (part[index, 2] - part[index, 0]) * t).astype(np.int64)
+        y = np.rint(part[index, 1] + (part[index, 3] - part[index, 1]) * t).astype(np.int64)
+        inside = (x >= 0) & (x < mask.shape[1]) & (y >= 0) & (y < mask.shape[0])
+        mask[y[inside], x[inside]] = True
+
+def thicken(mask, radius):
+    # Толщина пера: маска расширяется кругом радиуса radius сдвигами, по числу пикселей круга
+    if radius <= 0:
+        return mask
+    padded, result = np.pad(mask, radius), np.zeros_like(mask)
+    height, width = mask.shape
+    for oy in range(-radius, radius + 1):
+        for ox in range(-radius, radius + 1):
+            if ox*ox + oy*oy <= radius*radius + radius:
+                result |= padded[radius + oy:radius + oy + height, radius + ox:radius + ox + width]
+    return result
+
+def render(groups, size, margin=0.05):
+    # groups — [(цвет, толщина, отрезки)], рисунок вписывается в квадрат size×size, ось y смотрит вверх
+    image = np.full((size, size, 3), 255, np.uint8)
+    everything = [lines for _, _, lines in groups if len(lines)]
+    if not everything:
+        return image
+    points = np.concatenate([lines.reshape(-1, 2) for lines in everything])
+    low, high = points.min(axis=0), points.max(axis=0)
+    scale = size * (1 - 2*margin) / max(high[0] - low[0], high[1] - low[1], 1e-9)
+    center = (low + high) / 2
+    for color, width, lines in groups:
+        if not len(lines):
+            continue
+        pixels = np.empty_like(lines)
+        pixels[:, 0::2] = (lines[:, 0::2] - center[0]) * scale + size / 2
+        pixels[:, 1::2] = size / 2 - (lines[:, 1::2] - center[1]) * scale
+        mask = np.zeros((size, size), bool)
+        rasterize(mask, pixels)
+        image[thicken(mask, round(width * scale / 2))] = color
+    return image
+
+def write_png(path, image):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    height, width, _ = image.shape
+    rows = np.concatenate([np.zeros((height, 1), np.uint8), image.reshape(height, -1)], axis=1)  # фильтр 0
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        file.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        file.write(chunk(b"IEND", b""))
+
+def render_file(path, output, size):
+    if path.endswith(".strokes"):
+        groups = stroke_segments(path)
+    else:
+        with open(path, encoding="utf-8") as file:
+            groups = [(rgb(PEN_COLOR), PEN_SIZE, segments(parse(file.read())))]
+    write_png(output, render(groups, size))
+    return output, sum(len(lines) for _, _, lines in groups)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Рисунки черепашки в PNG без экрана")
+    parser.add_argument("files", nargs="+", help="скрипты команд или файлы .strokes")
+    parser.add_argument("--size", type=int, default=256, help="сторона картинки в пикселях")
+    parser.add_argument("--out", help="папка для PNG (по умолчанию рядом с исходным файлом)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    outputs = [os.path.join(args.out or os.path.dirname(path), os.path.splitext(os.path.basename(path))[0] + ".png")
+               for path in args.files]
+    failed = 0
+    with ProcessPoolExecutor(args.workers) as pool:
+        jobs = [pool.submit(render_file, path, output, args.size) for path, output in zip(args.files, outputs)]
+        for path, job in zip(args.files, jobs):
+            try:
+                output, count = job.result()
+                print(f"{path} -> {output} ({count} отрезков)")
+            except Exception as error:
+                # Битый файл в архиве (обрезанный заголовок, испорченный zlib и т. п.) не останавливает остальные
+                failed += 1
+                print(f"{path}: {type(error).__name__}: {error}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,152 @@
+import sys, zlib, struct
+from array import array
+
+# Запись рисунка: каждый отрезок — начало, конец, перо, цвет и толщина в плоских массивах,
+# а не отдельный объект на отрезок. Файл: заголовок, состояние черепашки, палитра цветов и сжатые zlib массивы
+MAGIC, VERSION = b"TRTL", 2
+HEADER = struct.Struct("<4sBII")  # метка, версия, число отрезков, длина палитры в байтах
+STATE = struct.Struct("<fB")  # направление и опущено ли перо при сохранении (с версии 2)
+
+def to_little(values):
+    if sys.byteorder == "little":
+        return values.tobytes()
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values.tobytes()
+
+def from_little(typecode, data):
+    values = array(typecode, data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+def color_name(color):
+    # pencolor() отдаёт строку или кортеж (0..1 или 0..255) — в палитре храним строку
+    if isinstance(color, str):
+        return color
+    scale = 1 if any(c > 1 for c in color) else 255
+    return "#%02x%02x%02x" % tuple(round(c * scale) for c in color)
+
+class Strokes:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.coords = array("f")  # x0, y0, x1, y1 подряд
+        self.width, self.color = array("H"), array("H")
+        self.pen = bytearray()
+        self.palette, self.colors = [], {}
+        self.heading, self.down = None, True  # None — направление неизвестно (файл первой версии)
+
+    def __len__(self):
+        return len(self.pen)
+
+    def add(self, start, end, pen, color, width):
+        color = color_name(color)
+        if color not in self.colors:
+            self.colors[color] = len(self.palette)
+            self.palette.append(color)
+        self.coords.extend((start[0], start[1], end[0], end[1]))
+        self.pen.append(1 if pen else 0)
+        self.color.append(self.colors[color])
+        self.width.append(round(width))
+
+    def record(self, t, action, *args):
+        # Выполнить движение черепашки и записать получившийся отрезок
+        start = t.position()
+        action(*args)
+        self.add(start, t.position(), t.isdown(), t.pencolor(), t.pensize())
+
+    def save(self, path, t):
+        # Направление и перо берутся у черепашки: повороты и pup/pdown после последнего шага в отрезки не попадают
+        names = "\n".join(self.palette).encode()
+        body = to_little(self.coords) + to_little(self.width) + to_little(self.color) + bytes(self.pen)
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(self), len(names)))
+            file.write(STATE.pack(t.heading(), t.isdown()))
+            file.write(names)
+            file.write(zlib.compress(body))
+
+    def segments(self):
+        # (x0, y0, x1, y1, цвет, толщина) для отрезков с опущенным пером
+        coords = self.coords
+        for i in range(len(self)):
+            if self.pen[i]:
+                yield (*coords[4*i:4*i + 4], self.palette[self.color[i]], self.width[i])
+
+    def draw(self, t, screen):
+        # Весь рисунок без анимации и одним обновлением экрана
+        tracer = screen.tracer()
+        screen.tracer(0)
+        position = style = None
+        for x0, y0, x1, y1, color, width in self.segments():
+            if position != (x0, y0):
+                t.penup()
+                t.goto(x0, y0)
+                t.pendown()
+            if style != (color, width):
+                style = (color, width)
+                t.pencolor(color)
+                t.pensize(width)
+            t.goto(x1, y1)
+            position = (x1, y1)
+        # Черепашка встаёт туда, где закончилась запись, с тем же пером и направлением, что при сохранении
+        t.penup()
+        if len(self):
+            x0, y0, x1, y1 = self.coords[-4:]
+            t.goto(x1, y1)
+            if self.heading is None and (x0, y0) != (x1, y1):
+                # В первой версии направления нет — остаётся направление последнего шага
+                t.setheading((t.towards(x0, y0) + 180) % 360)
+        if self.heading is not None:
+            t.setheading(self.heading)
+        if self.down:
+            t.pendown()
+        screen.update()
+        screen.tracer(tracer)
+
+    def to_svg(self, path, margin=10):
+        # Соединённые отрезки одного цвета и толщины идут одним path; ось y у SVG смотрит вниз
+        paths, bounds = [], [float("inf"), float("inf"), float("-inf"), float("-inf")]
+        position = style = None
+        for x0, y0, x1, y1, color, width in self.segments():
+            y0, y1 = 0.0 - y0, 0.0 - y1  # без «-0.0» в файле
+            if position != (x0, y0) or style != (color, width):
+                paths.append([color, width, f"M{x0:.1f},{y0:.1f}"])
+                style = (color, width)
+            paths[-1].append(f"L{x1:.1f},{y1:.1f}")
+            position = (x1, y1)
+            bounds = [min(bounds[0], x0, x1), min(bounds[1], y0, y1), max(bounds[2], x0, x1), max(bounds[3], y0, y1)]
+        if not paths:
+            bounds = [0, 0, 0, 0]
+        left, top = bounds[0] - margin, bounds[1] - margin
+        width, height = bounds[2] - bounds[0] + 2*margin, bounds[3] - bounds[1] + 2*margin
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{left:.1f} {top:.1f} {width:.1f} {height:.1f}">\n')
+            for color, stroke_width, *commands in paths:
+                file.write(f'<path d="{" ".join(commands)}" fill="none" stroke="{color}" stroke-width="{stroke_width}" '
+                           f'stroke-linecap="round" stroke-linejoin="round"/>\n')
+            file.write("</svg>\n")
+
+def load(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, count, names_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError("это не рисунок черепашки или неизвестная версия")
+    strokes, start = Strokes(), HEADER.size
+    if version >= 2:
+        strokes.heading, down = STATE.unpack_from(data, start)
+        strokes.down, start = bool(down), start + STATE.size
+    names = data[start:start + names_size].decode()
+    strokes.palette = names.split("\n") if names else []
+    strokes.colors = {name: i for i, name in enumerate(strokes.palette)}
+    body = zlib.decompress(data[start + names_size:])
+    sizes = (16 * count, 2 * count, 2 * count)
+    strokes.coords = from_little("f", body[:sizes[0]])
+    strokes.width = from_little("H", body[sizes[0]:sizes[0] + sizes[1]])
+    strokes.color = from_little("H", body[sizes[0] + sizes[1]:sum(sizes)])
+    strokes.pen = bytearray(body[sum(sizes):])
+    if version == 1:
+        strokes.down = bool(strokes.pen[-1]) if count else True
+    return strokes